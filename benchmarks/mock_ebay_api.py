@@ -0,0 +1,161 @@
+"""
+Local stand-in for the eBay Sell Inventory, Sell Account and identity APIs.
+
+Run standalone with `python -m benchmarks.mock_ebay_api --port 8900` and point
+EBAY_API_BASE at it, or start it in-process with `start_mock_api()`.
+"""
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class MockEbayState:
+    def __init__(self, latency=0.0, seed_items=0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.items = {}
+        self.offers = {}
+        for i in range(seed_items):
+            sku = f"SEED{i:05d}"
+            self.items[sku] = {"sku": sku, "product": {"title": f"Seed item {i}"}, "availability": {}}
+            offer_id = str(next(self.ids))
+            self.offers[offer_id] = {
+                "offerId": offer_id, "sku": sku, "format": "FIXED_PRICE", "status": "PUBLISHED",
+                "pricingSummary": {"price": {"value": str(10 + i % 90), "currency": "USD"}},
+            }
+
+
+class MockEbayHandler(BaseHTTPRequestHandler):
+    state = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=None):
+        if status == 204:
+            self.send_response(204)
+            self.end_headers()
+            return
+        payload = json.dumps(body if body is not None else {}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if self.headers.get("Content-Type", "").startswith("application/json") and raw:
+            return json.loads(raw)
+        return raw.decode()
+
+    def _page(self, records, key, query):
+        limit = int(query.get("limit", ["25"])[0])
+        offset = int(query.get("offset", ["0"])[0])
+        return {"total": len(records), "limit": limit, "offset": offset, key: records[offset:offset + limit]}
+
+    def _route(self, method):
+        time.sleep(self.state.latency)
+        parsed = urlparse(self.path)
+        path, query = parsed.path, parse_qs(parsed.query)
+        body = self._body() if method in ("POST", "PUT") else None
+        state = self.state
+
+        if path == "/identity/v1/oauth2/token" and method == "POST":
+            return self._send(200, {
+                "access_token": f"mock-access-{next(state.ids)}",
+                "expires_in": 7200,
+                "refresh_token": "mock-refresh",
+                "token_type": "User Access Token",
+            })
+
+        policy = re.fullmatch(r"/sell/account/v1/(\w+)_policy", path)
+        if policy:
+            policy_type = policy.group(1)
+            if method == "GET":
+                return self._send(200, {f"{policy_type}Policies": [{f"{policy_type}PolicyId": f"{policy_type}-1"}]})
+            return self._send(201, {f"{policy_type}PolicyId": f"{policy_type}-{next(state.ids)}"})
+
+        item = re.fullmatch(r"/sell/inventory/v1/inventory_item/([^/]+)", path)
+        if item:
+            sku = item.group(1)
+            with state.lock:
+                if method == "PUT":
+                    # Like eBay: 201 when the item is created, 204 (no body) when it is replaced
+                    status = 204 if sku in state.items else 201
+                    state.items[sku] = {**(body or {}), "sku": sku}
+                    return self._send(status, {})
+                if sku in state.items:
+                    return self._send(200, state.items[sku])
+            return self._send(404, {"errors": [{"message": "Not found"}]})
+
+        if path == "/sell/inventory/v1/inventory_item" and method == "GET":
+            with state.lock:
+                records = list(state.items.values())
+            return self._send(200, self._page(records, "inventoryItems", query))
+
+        if path == "/sell/inventory/v1/offer":
+            with state.lock:
+                if method == "POST":
+                    offer_id = str(next(state.ids))
+                    state.offers[offer_id] = {**(body or {}), "offerId": offer_id, "status": "UNPUBLISHED"}
+                    return self._send(201, {"offerId": offer_id})
+                if "sku" not in query:
+                    return self._send(400, {"errors": [{"message": "sku is required"}]})
+                records = [offer for offer in state.offers.values() if offer.get("sku") == query["sku"][0]]
+            if not records:
+                return self._send(404, {"errors": [{"errorId": 25713, "message": "This Offer is not available."}]})
+            return self._send(200, self._page(records, "offers", query))
+
+        offer = re.fullmatch(r"/sell/inventory/v1/offer/([^/]+)(/publish)?", path)
+        if offer:
+            offer_id = offer.group(1)
+            with state.lock:
+                if offer_id not in state.offers:
+                    return self._send(404, {"errors": [{"message": "Not found"}]})
+                if offer.group(2) and method == "POST":
+                    state.offers[offer_id]["status"] = "PUBLISHED"
+                    return self._send(200, {"listingId": f"L{offer_id}"})
+                return self._send(200, state.offers[offer_id])
+
+        return self._send(404, {"errors": [{"message": f"No mock for {method} {path}"}]})
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PUT(self):
+        self._route("PUT")
+
+
+def start_mock_api(port=0, latency=0.0, seed_items=0):
+    """Serve the mock API on a background thread; returns (server, base_url)."""
+    handler = type("BoundMockEbayHandler", (MockEbayHandler,), {"state": MockEbayState(latency, seed_items)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock eBay Sell/identity APIs")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--seed-items", type=int, default=0, help="Pre-populated inventory items and offers")
+    args = parser.parse_args()
+    server, base_url = start_mock_api(args.port, args.latency, args.seed_items)
+    print(f"Mock eBay API listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
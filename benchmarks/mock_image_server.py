@@ -0,0 +1,75 @@
+"""
+Local stand-in for the eBay/Mercari image CDNs.
+
+Serves a generated PNG for any path, sized by a `WxH` path component
+(e.g. /images/g/abc/s-l1600x1200.png), so /img/ caching and resizing can be
+exercised offline. Add 127.0.0.1 to IMAGE_ALLOWED_HOSTS to proxy it.
+"""
+import argparse
+import re
+import struct
+import threading
+import time
+import zlib
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SIZE_RE = re.compile(r"(\d+)x(\d+)")
+
+
+@lru_cache(maxsize=32)
+def make_png(width, height):
+    """Gradient RGB PNG, big enough on the wire to make caching visible."""
+    rows = b"".join(
+        b"\x00" + bytes(value for x in range(width) for value in (x * 255 // width, y * 255 // height, (x ^ y) & 255))
+        for y in range(height)
+    )
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows, 1)) + chunk(b"IEND", b"")
+
+
+class MockImageHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    requests_served = 0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        type(self).requests_served += 1
+        size = SIZE_RE.search(self.path)
+        width, height = (int(size.group(1)), int(size.group(2))) if size else (500, 500)
+        body = make_png(min(width, 2000), min(height, 2000))
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_mock_images(port=0, latency=0.0):
+    """Serve mock images on a background thread; returns (server, base_url)."""
+    handler = type("BoundMockImageHandler", (MockImageHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock image CDN")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    args = parser.parse_args()
+    server, base_url = start_mock_images(args.port, args.latency)
+    print(f"Mock image server listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,134 @@
+"""
+Replay a traffic capture (TRAFFIC_CAPTURE_PATH) against a running Price-It instance.
+
+    python -m benchmarks.replay capture.jsonl --target https://staging:443 --speedup 4 --concurrency 16
+    python -m benchmarks.replay capture.jsonl --fake-driver --drivers 2 --output replay.json
+
+Requests are sent at their recorded offsets divided by --speedup (0 sends them
+back-to-back). With --fake-driver the app is started in-process on the fake
+driver and mock eBay API, so driver pool and scraper changes can be checked
+against a real request mix with no browsers.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import requests  # noqa: E402
+from benchmarks.report import print_results, save_results, summarize  # noqa: E402
+
+
+def load_capture(path, limit=None):
+    entries = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+            if limit and len(entries) >= limit:
+                break
+    entries.sort(key=lambda entry: entry["t"])
+    return entries
+
+
+def replay(entries, target, speedup, concurrency, timeout):
+    """Fire the captured requests at `target`; returns per-route summaries."""
+    by_route = {}
+    lock = threading.Lock()
+    local = threading.local()
+    lag = []
+
+    def send(entry):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        url = f"{target}{entry['p']}" + (f"?{entry['q']}" if entry.get("q") else "")
+        body = entry.get("b")
+        headers = {"Content-Type": "application/json"} if body else {}
+        start = time.perf_counter()
+        try:
+            response = local.session.request(
+                entry["m"], url, data=body.encode() if body else None, headers=headers, timeout=timeout
+            )
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - start
+        route = entry.get("r") or entry["p"]
+        with lock:
+            latencies, errors = by_route.setdefault(f"{entry['m']} {route}", ([], [0]))
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors[0] += 1
+
+    first = entries[0]["t"] if entries else 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for entry in entries:
+            if speedup > 0:
+                due = (entry["t"] - first) / speedup
+                delay = due - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    lag.append(-delay)
+            executor.submit(send, entry)
+    elapsed = time.perf_counter() - start
+
+    results = {route: summarize(latencies, errors[0], elapsed) for route, (latencies, errors) in sorted(by_route.items())}
+    all_latencies = [value for latencies, _ in by_route.values() for value in latencies]
+    all_errors = sum(errors[0] for _, errors in by_route.values())
+    results["ALL"] = summarize(all_latencies, all_errors, elapsed)
+    results["ALL"]["max_dispatch_lag_ms"] = round(max(lag) * 1000, 1) if lag else 0.0
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured Price-It traffic")
+    parser.add_argument("capture", help="JSONL file written via TRAFFIC_CAPTURE_PATH")
+    parser.add_argument("--target", help="Base URL of the app under test")
+    parser.add_argument("--fake-driver", action="store_true", help="Start the app locally on the fake driver and mock eBay API")
+    parser.add_argument("--speedup", type=float, default=1.0, help="Divide recorded gaps by this factor; 0 = no gaps")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum requests in flight")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--limit", type=int, help="Only replay the first N captured requests")
+    parser.add_argument("--drivers", type=int, default=4, help="Fake drivers per platform (--fake-driver)")
+    parser.add_argument("--driver-latency", type=float, default=1.0, help="Fake page load seconds (--fake-driver)")
+    parser.add_argument("--api-latency", type=float, default=0.1, help="Mock eBay API seconds (--fake-driver)")
+    parser.add_argument("--seed-items", type=int, default=100)
+    parser.add_argument("--output", help="Write per-route results to this JSON file")
+    args = parser.parse_args()
+    if not args.target and not args.fake_driver:
+        parser.error("pass --target or --fake-driver")
+
+    entries = load_capture(os.path.abspath(args.capture), args.limit)
+    output = os.path.abspath(args.output) if args.output else None
+    target = args.target
+    if args.fake_driver:
+        from benchmarks.run import configure_environment, start_app_server
+
+        configure_environment(args)
+        from platforms.ebay.security import oauth2_manager
+
+        oauth2_manager.save_tokens({"refresh_token": "mock-refresh"})
+        target = start_app_server()
+
+    print(f"Replaying {len(entries)} requests against {target} (speedup={args.speedup}, concurrency={args.concurrency})")
+    results = replay(entries, target.rstrip("/"), args.speedup, args.concurrency, args.timeout)
+    print_results(results)
+    if output:
+        save_results(output, results, {"capture": args.capture, "target": target, **{
+            key: value for key, value in vars(args).items() if key not in ("capture", "output", "target")
+        }})
+        print(f"\nSaved results to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = math.ceil(q / 100 * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(rank, 1)) - 1]
+
+
+def summarize(latencies, errors, elapsed):
+    """Throughput and latency percentiles (ms) for one scenario or route."""
+    ordered = sorted(latencies)
+    count = len(ordered) + errors
+
+    def ms(value):
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "count": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "throughput_per_s": round(count / elapsed, 2) if elapsed else None,
+        "mean_ms": ms(sum(ordered) / len(ordered)) if ordered else None,
+        "p50_ms": ms(percentile(ordered, 50)),
+        "p95_ms": ms(percentile(ordered, 95)),
+        "p99_ms": ms(percentile(ordered, 99)),
+        "max_ms": ms(ordered[-1]) if ordered else None,
+    }
+
+
+def run_concurrently(func, iterations, concurrency):
+    """Call func() `iterations` times across `concurrency` threads and summarize it.
+
+    func returns False (or raises) to count a call as an error.
+    """
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def call(_):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            ok = func() is not False
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, range(iterations)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def save_results(path, results, meta):
+    with open(path, "w") as file:
+        json.dump({"meta": meta, "results": results}, file, indent=2)
+
+
+def print_results(results, baseline=None):
+    """Print one line per scenario, with p50/throughput change against a baseline run."""
+    header = f"{'scenario':<28}{'count':>7}{'err%':>7}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, summary in results.items():
+        line = (
+            f"{name:<28}{summary['count']:>7}{summary['error_rate'] * 100:>7.1f}"
+            f"{summary['throughput_per_s'] or 0:>10.1f}{summary['p50_ms'] or 0:>10.2f}"
+            f"{summary['p95_ms'] or 0:>10.2f}{summary['p99_ms'] or 0:>10.2f}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous and previous.get("p50_ms") and summary.get("p50_ms"):
+            change = (summary["p50_ms"] - previous["p50_ms"]) / previous["p50_ms"] * 100
+            line += f"   p50 {change:+.1f}% vs baseline"
+        print(line)
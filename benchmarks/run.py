@@ -0,0 +1,155 @@
+"""
+Offline benchmark suite for Price-It.
+
+Scrapers run against recorded result pages through the fake driver and the
+sell/listings routes run against benchmarks/mock_ebay_api.py, so no network
+or browser is needed:
+
+    python -m benchmarks.run --iterations 200 --concurrency 8 --output bench.json
+    python -m benchmarks.run --scenarios parse_ebay,outliers --baseline bench.json
+    python -m benchmarks.run --scenarios parse_mercari_dom,parse_mercari_embedded
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(REPO_ROOT, "benchmarks", "fixtures")
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.mock_ebay_api import start_mock_api  # noqa: E402
+from benchmarks.report import print_results, run_concurrently, save_results  # noqa: E402
+
+
+def configure_environment(args):
+    """Point the app at the fake driver and mock API before any app module is imported."""
+    _, api_base = start_mock_api(latency=args.api_latency, seed_items=args.seed_items)
+    workdir = tempfile.mkdtemp(prefix="price-it-bench-")
+    os.environ.update({
+        "DRIVER_BACKEND": "fake",
+        "FAKE_DRIVER_FIXTURES": FIXTURES,
+        "FAKE_DRIVER_LATENCY": str(args.driver_latency),
+        "SCRAPER_NUM_DRIVERS": str(args.drivers),
+        "EBAY_API_BASE": api_base,
+        "TOKEN_STORAGE_PATH": os.path.join(workdir, "resources", "ebay_tokens.json"),
+        "STATE_STORAGE_PATH": os.path.join(workdir, "resources", "oauth_state.json"),
+    })
+    # oauth2_manager keeps its key material under ./resources
+    os.chdir(workdir)
+    return api_base
+
+
+def start_app_server():
+    import uvicorn
+    import main
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def build_scenarios(app_url):
+    import requests
+    from platforms.ebay.automation import ebay_parser
+    from platforms.ebay.automation.ebay_scraper import scraper as ebay_scraper
+    from platforms.ebay.security import oauth2_manager
+    from platforms.mercari.automation.mercari_parser import parse_embedded_items, parse_page_dom
+    from platforms.mercari.automation.mercari_scraper import scraper as mercari_scraper
+    from utils.utils import detect_price_outliers
+
+    oauth2_manager.save_tokens({"refresh_token": "mock-refresh"})
+    with open(os.path.join(FIXTURES, "ebay_sold.html"), encoding="utf-8") as file:
+        ebay_html = file.read()
+    with open(os.path.join(FIXTURES, "mercari_sold.html"), encoding="utf-8") as file:
+        mercari_html = file.read()
+    ebay_items = ebay_parser.parse_page(ebay_html)
+    local = threading.local()
+    skus = iter(range(10 ** 9))
+
+    def session():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    def http_ok(response):
+        return response.status_code < 400 and "error" not in response.text[:200]
+
+    return {
+        "parse_ebay": lambda: bool(ebay_parser.parse_page(ebay_html)),
+        "parse_mercari_dom": lambda: bool(parse_page_dom(mercari_html)),
+        "parse_mercari_embedded": lambda: bool(parse_embedded_items(mercari_html)),
+        "outliers": lambda: bool(detect_price_outliers([copy.copy(item) for item in ebay_items])),
+        "scrape_ebay": lambda: bool(asyncio.run(ebay_scraper.scrape_ebay_sold("iphone 12"))),
+        "scrape_mercari": lambda: bool(asyncio.run(mercari_scraper.scrape_mercari_sold("iphone 12"))),
+        "token_refresh": lambda: isinstance(oauth2_manager.get_ebay_access_token(), str),
+        "http_sold_items": lambda: http_ok(session().get(f"{app_url}/sold-items", params={"q": "iphone 12"})),
+        "http_sell_item": lambda: http_ok(session().post(f"{app_url}/sell-item", json={
+            "sku": f"BENCH{next(skus)}", "title": "Apple iPhone 12 64GB Black", "price": 299.0,
+        })),
+        "http_listings": lambda: http_ok(session().get(f"{app_url}/listings")),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Price-It benchmarks with no network access")
+    parser.add_argument("--scenarios", default="all", help="Comma-separated scenario names, or 'all'")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--drivers", type=int, default=4, help="Fake drivers per platform pool")
+    parser.add_argument("--driver-latency", type=float, default=0.0, help="Simulated page load seconds")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="Simulated eBay API seconds")
+    parser.add_argument("--seed-items", type=int, default=100, help="Inventory items pre-loaded in the mock API")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+
+    api_base = configure_environment(args)
+    app_url = start_app_server()
+    scenarios = build_scenarios(app_url)
+    selected = list(scenarios) if args.scenarios == "all" else args.scenarios.split(",")
+
+    results = {}
+    for name in selected:
+        scenarios[name]()  # warm-up
+        results[name] = run_concurrently(scenarios[name], args.iterations, args.concurrency)
+
+    print_results(results, baseline)
+    meta = {
+        "timestamp": time.time(),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "mock_api": api_base,
+        **{key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+    }
+    save_results(output, results, meta)
+    print(f"\nSaved results to {output}")
+
+
+if __name__ == "__main__":
+    main()
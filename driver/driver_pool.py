@@ -1,21 +1,104 @@
-from ebaysdk import UserAgent
-from s3transfer import queue
+import queue
+import threading
+
 from botasaurus_driver import driver
-from utils import settings
+from driver.fake_driver import FakeDriver
+from driver.profile_manager import profiles
+from fake_useragent import UserAgent
+from utils import metrics, settings
 from utils.log_manager import console
 
-pool = queue.Queue()
 
+class DriverUnavailable(Exception):
+    """No driver could be leased within the request's time budget."""
+
+
+def create_driver(user_agent, profile=None):
+    """Start a driver for the configured DRIVER_BACKEND, optionally on an existing profile dir."""
+    if settings.DRIVER_BACKEND == "fake":
+        return FakeDriver(user_agent=user_agent, headless=True)
+    if profile:
+        return driver.Driver(profile=profile, user_agent=user_agent, headless=True)
+    return driver.Driver(user_agent=user_agent, headless=True)
+
+
+class DriverPool:
+    """Persistent Botasaurus drivers for one platform, with lease/wait accounting."""
+
+    def __init__(self, platform, size=None):
+        self.platform = platform
+        self.lock = threading.Lock()
+        self.drivers = queue.Queue()
+        self.size = 0
+        self.leased = 0
+        self.waiting = 0
+        self.profiles = {}  # id(driver) -> cloned profile dir, removed on shutdown
+        metrics.register_driver_pool(self)
+        self.spawn(size or getattr(settings, "SCRAPER_NUM_DRIVERS", 3))
 
-def _initialize_drivers():
-    num_drivers = getattr(settings, "SCRAPER_NUM_DRIVERS", 3)
-    console.info(f"Spawning {num_drivers} persistent drivers...")
-    for _ in range(num_drivers):
+    def spawn(self, count):
+        console.info(f"Spawning {count} persistent drivers for {self.platform}...")
+        use_profiles = settings.BROWSER_PROFILES_ENABLED and settings.DRIVER_BACKEND != "fake"
+        for _ in range(count):
+            profile = None
+            try:
+                user_agent = UserAgent().random if hasattr(UserAgent(), "random") else "Mozilla/5.0"
+                if use_profiles:
+                    # Reuse the warm profile's user agent so its cookies stay consistent
+                    profile, warm_user_agent = profiles.clone(self.platform)
+                    user_agent = warm_user_agent or user_agent
+                bot = create_driver(user_agent, profile)
+            except Exception as e:
+                console.error(f"❌ Failed to initialize driver: {e}")
+                profiles.release(profile)
+                continue
+            with self.lock:
+                self.size += 1
+                if profile:
+                    self.profiles[id(bot)] = profile
+            self.drivers.put(bot)
+
+    def get(self, timeout=None):
+        """Lease a driver, waiting up to `timeout` seconds. Raises queue.Empty."""
+        with self.lock:
+            self.waiting += 1
         try:
-            user_agent = UserAgent().random if hasattr(UserAgent(), 'random') else 'Mozilla/5.0'
-            bot = driver.Driver(user_agent=user_agent, headless=True)
-            pool.put(bot)
-        except Exception as e:
-            console.error(f"Error initializing driver: {e}")
+            bot = self.drivers.get(timeout=timeout)
+        finally:
+            with self.lock:
+                self.waiting -= 1
+        with self.lock:
+            self.leased += 1
+        return bot
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+    def put(self, bot):
+        """Return a leased driver to the pool."""
+        with self.lock:
+            self.leased -= 1
+        self.drivers.put(bot)
+
+    def empty(self):
+        return self.drivers.empty()
+
+    def shutdown(self):
+        while not self.drivers.empty():
+            try:
+                bot = self.drivers.get_nowait()
+            except queue.Empty:
+                break
+            with self.lock:
+                self.size -= 1
+                profile = self.profiles.pop(id(bot), None)
+            try:
+                bot.close()
+            except Exception as e:
+                # Chrome may still be running on the clone; the next startup's sweep removes it
+                console.error(f"Failed to shutdown driver: {e}")
+                continue
+            profiles.release(profile)
+
 
-_initialize_drivers()
+pool = DriverPool("stealth")
@@ -0,0 +1,51 @@
+import os
+import time
+import urllib.parse
+
+from utils import settings
+
+
+class FakeDriver:
+    """
+    Stand-in for a Botasaurus driver that replays recorded HTML fixtures.
+    Selected with DRIVER_BACKEND=fake for benchmarks and load replays; pages
+    are served from FAKE_DRIVER_FIXTURES after FAKE_DRIVER_LATENCY seconds.
+    """
+
+    FIXTURES = {
+        "www.ebay.com": "ebay_sold.html",
+        "www.mercari.com": "mercari_sold.html",
+    }
+    _cache = {}
+
+    def __init__(self, user_agent=None, headless=True, **kwargs):
+        self.user_agent = user_agent
+        self.current_url = None
+        self.page_html = ""
+
+    @classmethod
+    def _fixture(cls, name):
+        if name not in cls._cache:
+            with open(os.path.join(settings.FAKE_DRIVER_FIXTURES, name), encoding="utf-8") as file:
+                cls._cache[name] = file.read()
+        return cls._cache[name]
+
+    def get(self, url):
+        time.sleep(settings.FAKE_DRIVER_LATENCY)
+        self.current_url = url
+        name = self.FIXTURES.get(urllib.parse.urlparse(url).netloc)
+        self.page_html = self._fixture(name) if name else "<html><body></body></html>"
+
+    google_get = get
+
+    def wait_for_element(self, selector, wait=None):
+        return True
+
+    def type(self, selector, text):
+        pass
+
+    def click(self, selector):
+        pass
+
+    def close(self):
+        pass
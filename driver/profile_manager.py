@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from botasaurus_driver import driver
+from fake_useragent import UserAgent
+from utils import settings
+from utils.log_manager import console
+
+# Files Chrome holds while a profile is open; copying them makes the clone look in use
+LOCK_FILES = ("SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile", "LOCK")
+META_FILE = "price_it_profile.json"
+
+
+def _process_alive(pid):
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        return True  # os.kill(pid, 0) would signal the process on Windows; keep its clones
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ProfileManager:
+    """
+    Keeps one warmed browser profile snapshot per platform (cookies, local
+    storage, disk cache, consent/region state). New drivers start from a copy
+    of the snapshot instead of an empty profile; missing snapshots and those
+    older than BROWSER_PROFILE_REFRESH_SECONDS are built in the background.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.lock = threading.Lock()
+        self.platform_locks = {}
+        self.watched = set()
+        self.refreshing = set()
+        self.watcher = None
+
+    def _platform_lock(self, platform):
+        with self.lock:
+            return self.platform_locks.setdefault(platform, threading.Lock())
+
+    def snapshot_dir(self, platform):
+        return os.path.join(self.root, platform, "snapshot")
+
+    def read_meta(self, platform):
+        try:
+            with open(os.path.join(self.snapshot_dir(platform), META_FILE)) as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def is_stale(self, platform):
+        meta = self.read_meta(platform)
+        return meta is None or time.time() - meta["created"] > settings.BROWSER_PROFILE_REFRESH_SECONDS
+
+    def clone(self, platform):
+        """
+        Copy the platform's warm snapshot into a fresh profile dir; returns (path, user_agent).
+        Without a snapshot yet, one is built in the background and (None, None) is returned,
+        so the caller starts on an empty profile instead of waiting for a warm-up browser.
+        """
+        self.watch(platform)
+        if self.read_meta(platform) is None:
+            self.refresh_in_background(platform)
+            return None, None
+
+        clones = os.path.join(self.root, platform, "clones")
+        os.makedirs(clones, exist_ok=True)
+        # The owning pid lets a later startup tell abandoned clones from ones in use
+        target = tempfile.mkdtemp(prefix=f"driver-{os.getpid()}-", dir=clones)
+        with self._platform_lock(platform):
+            meta = self.read_meta(platform)
+            if meta is not None:
+                shutil.copytree(
+                    self.snapshot_dir(platform), target, dirs_exist_ok=True,
+                    ignore=shutil.ignore_patterns(*LOCK_FILES, META_FILE),
+                )
+        return target, (meta or {}).get("user_agent")
+
+    def release(self, path):
+        """Delete a clone once its driver has quit."""
+        if path and os.path.abspath(path).startswith(self.root):
+            shutil.rmtree(path, ignore_errors=True)
+
+    def sweep_clones(self):
+        """Delete clones left behind by processes that exited without shutting their drivers down."""
+        for platform in os.listdir(self.root) if os.path.isdir(self.root) else []:
+            clones = os.path.join(self.root, platform, "clones")
+            if not os.path.isdir(clones):
+                continue
+            for name in os.listdir(clones):
+                owner = name.split("-")[1] if name.count("-") >= 2 else ""
+                if owner.isdigit() and _process_alive(int(owner)):
+                    continue
+                shutil.rmtree(os.path.join(clones, name), ignore_errors=True)
+                console.info(f"🧹 Removed leftover {platform} profile clone {name}.")
+
+    def refresh_in_background(self, platform):
+        threading.Thread(target=self.refresh, args=(platform,), daemon=True).start()
+
+    def refresh(self, platform):
+        """Warm a throwaway browser on the platform's warm-up URLs and swap it in as the new snapshot."""
+        with self.lock:
+            if platform in self.refreshing:
+                return
+            self.refreshing.add(platform)
+        try:
+            self._refresh(platform)
+        finally:
+            with self.lock:
+                self.refreshing.discard(platform)
+
+    def _refresh(self, platform):
+        urls = settings.BROWSER_PROFILE_WARMUP_URLS.get(platform, [])
+        workdir = tempfile.mkdtemp(prefix=f"warm-{platform}-")
+        user_agent = UserAgent().random
+        console.info(f"🔥 Warming {platform} browser profile...")
+        try:
+            bot = driver.Driver(profile=workdir, user_agent=user_agent, headless=True)
+            try:
+                for url in urls:
+                    bot.get(url)
+            finally:
+                bot.close()
+
+            snapshot = self.snapshot_dir(platform)
+            staging = f"{snapshot}.new"
+            shutil.rmtree(staging, ignore_errors=True)
+            shutil.copytree(workdir, staging, ignore=shutil.ignore_patterns(*LOCK_FILES))
+            with open(os.path.join(staging, META_FILE), "w") as file:
+                json.dump({"created": time.time(), "user_agent": user_agent, "urls": urls}, file)
+
+            with self._platform_lock(platform):
+                retired = f"{snapshot}.old"
+                if os.path.exists(snapshot):
+                    os.replace(snapshot, retired)
+                os.replace(staging, snapshot)
+            shutil.rmtree(retired, ignore_errors=True)
+            console.info(f"✅ {platform} browser profile snapshot refreshed.")
+        except Exception as e:
+            console.error(f"❌ Failed to warm {platform} browser profile: {e}")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def watch(self, platform):
+        """Keep a platform's snapshot fresh from a background thread."""
+        with self.lock:
+            self.watched.add(platform)
+            if self.watcher is None:
+                self.watcher = threading.Thread(target=self._refresh_loop, daemon=True)
+                self.watcher.start()
+
+    def _refresh_loop(self):
+        interval = max(60, settings.BROWSER_PROFILE_REFRESH_SECONDS // 4)
+        while True:
+            time.sleep(interval)
+            for platform in list(self.watched):
+                if self.is_stale(platform):
+                    self.refresh(platform)
+
+
+profiles = ProfileManager(settings.BROWSER_PROFILE_DIR)
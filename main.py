@@ -1,9 +1,27 @@
+import asyncio
 import os
+import time
 import uvicorn
-from fastapi import FastAPI
+from utils import settings
+
+if __name__ == "__mp_main__":
+    # Parse workers re-run this script when it was launched directly (python main.py); they only parse pages
+    settings.SCRAPER_NUM_DRIVERS = 0
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from driver.driver_pool import pool as stealth_pool
+from driver.profile_manager import profiles
 from platforms.ebay.automation.ebay_scraper import scraper
+from platforms.ebay.automation.ebay_web_poster import stealth_queue
+from platforms.mercari.automation.mercari_scraper import scraper as mercari_scraper
 from routes import router
+from utils import metrics, tracing
+from utils.admission import admit
+from utils.price_index import price_index
+from utils.price_trend import price_trends
+from utils.scrape_engine import engine
+from utils.traffic_capture import TrafficRecorder, capture_traffic
 
 app = FastAPI()
 
@@ -18,10 +36,82 @@ app.add_middleware(
 # Include routes
 app.include_router(router)
 
+
+if settings.ADMISSION_ENABLED:
+
+    # Registered first so it runs innermost: shed requests are still traced and measured
+    @app.middleware("http")
+    async def admission_control(request: Request, call_next):
+        return await admit(request, call_next)
+
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    """Trace each request into nested spans and return them as a Server-Timing header."""
+    trace, token = tracing.start_trace(f"{request.method} {request.url.path}")
+    try:
+        response = await call_next(request)
+        trace.root.end = time.perf_counter()
+        response.headers["Server-Timing"] = tracing.server_timing(trace)
+        return response
+    finally:
+        tracing.finish_trace(trace, token)
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Observe request latency per route template (not per raw path)."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.REQUEST_SECONDS.labels(
+            request.method, getattr(route, "path", "unmatched"), str(status)
+        ).observe(time.perf_counter() - start)
+
+
+if settings.TRAFFIC_CAPTURE_PATH:
+    traffic_recorder = TrafficRecorder(settings.TRAFFIC_CAPTURE_PATH)
+
+    @app.middleware("http")
+    async def record_traffic(request: Request, call_next):
+        return await capture_traffic(request, call_next, traffic_recorder)
+
+
+@app.on_event("startup")
+async def start_scrape_engine():
+    engine.start()
+
+
+@app.on_event("startup")
+async def sweep_profile_clones():
+    await asyncio.to_thread(profiles.sweep_clones)
+
+
+@app.on_event("startup")
+async def load_price_index():
+    if settings.PRICE_INDEX_PATH:
+        price_index.load(settings.PRICE_INDEX_PATH)
+    if settings.TREND_PATH:
+        price_trends.load(settings.TREND_PATH)
+
+
 @app.on_event("shutdown")
 async def shutdown_event():
     print("🔻 Shutting down gracefully...")
+    stealth_queue.shutdown()
+    engine.shutdown()
+    if settings.PRICE_INDEX_PATH:
+        price_index.save(settings.PRICE_INDEX_PATH)
+    if settings.TREND_PATH:
+        price_trends.save(settings.TREND_PATH)
     await scraper.shutdown_all()
+    await mercari_scraper.shutdown_all()
+    await asyncio.to_thread(stealth_pool.shutdown)
 
 """
 
@@ -0,0 +1,22 @@
+import time
+
+import requests
+from utils import metrics, tracing
+
+
+def ebay_request(endpoint, method, url, **kwargs):
+    """Send an eBay API request, recording its latency and status under `endpoint`."""
+    start = time.perf_counter()
+    status = "error"
+    try:
+        with tracing.span(f"ebay.{endpoint}", method=method):
+            response = requests.request(method, url, **kwargs)
+        status = str(response.status_code)
+        return response
+    finally:
+        metrics.EBAY_API_SECONDS.labels(endpoint, status).observe(time.perf_counter() - start)
+
+
+def response_body(response):
+    """Decoded JSON body, or {} for the empty 201/204 replies eBay sends on successful writes."""
+    return response.json() if response.content else {}
@@ -1,11 +1,14 @@
 import re
 import time
 
-import requests
 import json
+from platforms.ebay.api.ebay_client import ebay_request, response_body
+from platforms.ebay.api.listing_mirror import mirror
 from platforms.ebay.security.oauth2_manager import get_ebay_access_token
+from utils import settings, tracing
 
 
+@tracing.traced("policy_lookup")
 def get_or_create_policy(policy_type):
     """Checks if an eBay policy exists. If not, retrieves or creates one."""
     access_token = get_ebay_access_token()
@@ -14,7 +17,7 @@ def get_or_create_policy(policy_type):
         print("❌ Error: Unable to retrieve access token.")
         return None
 
-    url = f"https://api.ebay.com/sell/account/v1/{policy_type}_policy"
+    url = f"{settings.EBAY_API_BASE}/sell/account/v1/{policy_type}_policy"
     headers = {
         "Authorization": f"Bearer {access_token}",
         "Content-Type":  "application/json",
@@ -22,7 +25,7 @@ def get_or_create_policy(policy_type):
     }
 
     # ✅ Step 1: Check for existing policies
-    response = requests.get(url, headers=headers)
+    response = ebay_request(f"{policy_type}_policy", "GET", url, headers=headers)
 
     if response.status_code == 200:
         policies = response.json().get(f"{policy_type}Policies", [])
@@ -36,7 +39,7 @@ def get_or_create_policy(policy_type):
 
     # ✅ Step 2: Create a new policy (only if needed)
     print(f"🚀 Creating {policy_type} policy...")
-    create_url = f"https://api.ebay.com/sell/account/v1/{policy_type}_policy"
+    create_url = f"{settings.EBAY_API_BASE}/sell/account/v1/{policy_type}_policy"
 
     category_types = [{"name": "ALL_EXCLUDING_MOTORS_VEHICLES"}]  # Required format
 
@@ -78,7 +81,7 @@ def get_or_create_policy(policy_type):
         })
 
     # ✅ Send policy creation request
-    response = requests.post(create_url, json=policy_data, headers=headers)
+    response = ebay_request(f"{policy_type}_policy", "POST", create_url, json=policy_data, headers=headers)
     response_data = response.json()
 
     if response.status_code in [200, 201]:
@@ -125,7 +128,7 @@ def post_ebay_inventory_item(sku, title, price, condition, specifics):
               f"Fulfillment: {fulfillment_policy_id}, Payment: {payment_policy_id}, Return: {return_policy_id}")
         return {"success": False, "error": "Failed to retrieve eBay policies"}
 
-    url = f"https://api.ebay.com/sell/inventory/v1/inventory_item/{sku}"
+    url = f"{settings.EBAY_API_BASE}/sell/inventory/v1/inventory_item/{sku}"
 
     headers = {
         "Authorization": f"Bearer {access_token}",
@@ -161,11 +164,12 @@ def post_ebay_inventory_item(sku, title, price, condition, specifics):
         }
     }
 
-    response = requests.put(url, json=data, headers=headers)
+    response = ebay_request("inventory_item", "PUT", url, json=data, headers=headers)
 
     if response.status_code in [200, 201, 204]:
         print("✅ Inventory item posted successfully.")
-        return {"success": True, "response": response.json()}
+        mirror.put_item(data)
+        return {"success": True, "response": response_body(response)}
 
     print(f"❌ Error posting item: {response.text}")
     return {"success": False, "response": response.text}
@@ -177,7 +181,7 @@ def create_ebay_offer(sku, price):
     if not access_token:
         return {"success": False, "error": "Authentication failed"}
 
-    url = "https://api.ebay.com/sell/inventory/v1/offer"
+    url = f"{settings.EBAY_API_BASE}/sell/inventory/v1/offer"
 
     headers = {
         "Authorization": f"Bearer {access_token}",
@@ -193,8 +197,13 @@ def create_ebay_offer(sku, price):
         "pricingSummary": {"price": {"value": price, "currency": "USD"}}
     }
 
-    response = requests.post(url, json=data, headers=headers)
-    return response.json() if response.status_code in [200, 201] else {"success": False, "response": response.text}
+    response = ebay_request("offer", "POST", url, json=data, headers=headers)
+    if response.status_code not in [200, 201]:
+        return {"success": False, "response": response.text}
+    result = response.json()
+    if "offerId" in result:
+        mirror.put_offer({**data, "offerId": result["offerId"], "status": "UNPUBLISHED"})
+    return result
 
 def publish_ebay_offer(offer_id):
     """Publish an eBay offer to make the listing live."""
@@ -202,7 +211,7 @@ def publish_ebay_offer(offer_id):
     if not access_token:
         return {"success": False, "error": "Authentication failed"}
 
-    url = f"https://api.ebay.com/sell/inventory/v1/offer/{offer_id}/publish"
+    url = f"{settings.EBAY_API_BASE}/sell/inventory/v1/offer/{offer_id}/publish"
 
     headers = {
         "Authorization": f"Bearer {access_token}",
@@ -210,5 +219,9 @@ def publish_ebay_offer(offer_id):
         "Accept": "application/json"
     }
 
-    response = requests.post(url, headers=headers)
-    return response.json() if response.status_code in [200, 201] else {"success": False, "response": response.text}
+    response = ebay_request("publish", "POST", url, headers=headers)
+    if response.status_code not in [200, 201]:
+        return {"success": False, "response": response.text}
+    result = response.json()
+    mirror.update_offer(offer_id, status="PUBLISHED", listing={"listingId": result.get("listingId")})
+    return result
@@ -0,0 +1,297 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from platforms.ebay.api.ebay_client import ebay_request
+from platforms.ebay.security.oauth2_manager import get_ebay_access_token
+from utils import metrics, settings, tracing
+from utils.log_manager import console
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS inventory_items (
+    sku TEXT PRIMARY KEY,
+    title TEXT,
+    data TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS offers (
+    offer_id TEXT PRIMARY KEY,
+    sku TEXT,
+    status TEXT,
+    format TEXT,
+    price REAL,
+    listing_id TEXT,
+    data TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS offers_sku ON offers (sku);
+CREATE INDEX IF NOT EXISTS offers_status ON offers (status, format);
+CREATE INDEX IF NOT EXISTS inventory_items_title ON inventory_items (title COLLATE NOCASE);
+"""
+
+
+def _hash(record):
+    return hashlib.blake2b(json.dumps(record, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+def _offer_price(offer):
+    try:
+        return float(offer["pricingSummary"]["price"]["value"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _offer_row(offer, synced_at):
+    return (
+        str(offer["offerId"]), offer.get("sku"), offer.get("status"), offer.get("format"), _offer_price(offer),
+        (offer.get("listing") or {}).get("listingId") or offer.get("listingId"),
+        json.dumps(offer), _hash(offer), synced_at,
+    )
+
+
+def _item_row(item, synced_at):
+    return (
+        item["sku"], (item.get("product") or {}).get("title"), json.dumps(item), _hash(item), synced_at,
+    )
+
+
+class ListingMirror:
+    """
+    SQLite copy of the seller's inventory items and offers. Syncs fetch every
+    inventory page concurrently; a full sync then fetches every SKU's offers
+    (getOffers requires a sku), while a background refresh only fetches offers
+    for SKUs that are new or whose item changed. Only rows whose content
+    changed are rewritten, and the sell and modify paths write through, so
+    reads never need to call eBay.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.last_sync = None
+        self.last_full_sync = None
+        self.refreshing = False
+
+    # -- sync ---------------------------------------------------------------
+
+    def _fetch_page(self, endpoint, path, query, headers):
+        url = f"{settings.EBAY_API_BASE}{path}?limit={settings.LISTING_MIRROR_PAGE_SIZE}&{query}"
+        response = ebay_request(endpoint, "GET", url, headers=headers)
+        if endpoint == "offer" and response.status_code == 404:
+            return {}  # getOffers answers 404 for a SKU with no offers
+        response.raise_for_status()
+        return response.json()
+
+    def _fetch_concurrently(self, endpoint, path, queries, key, headers):
+        with ThreadPoolExecutor(max_workers=settings.LISTING_MIRROR_CONCURRENCY) as executor:
+            # One context copy per request: a copied context cannot be entered by two threads at once
+            pages = [
+                executor.submit(tracing.in_current_context(self._fetch_page), endpoint, path, query, headers)
+                for query in queries
+            ]
+            return [record for page in pages for record in page.result().get(key, [])]
+
+    def fetch_items(self, headers):
+        """Fetch page 1 for the total, then the remaining inventory pages concurrently."""
+        path = "/sell/inventory/v1/inventory_item"
+        first = self._fetch_page("inventory_item", path, "offset=0", headers)
+        records = list(first.get("inventoryItems", []))
+        total = first.get("total", len(records))
+        offsets = range(settings.LISTING_MIRROR_PAGE_SIZE, total, settings.LISTING_MIRROR_PAGE_SIZE)
+        return records + self._fetch_concurrently(
+            "inventory_item", path, [f"offset={offset}" for offset in offsets], "inventoryItems", headers,
+        )
+
+    def fetch_offers(self, skus, headers):
+        """Fetch every SKU's offers concurrently."""
+        queries = [f"sku={urllib.parse.quote(sku, safe='')}" for sku in skus]
+        return self._fetch_concurrently("offer", "/sell/inventory/v1/offer", queries, "offers", headers)
+
+    def sync(self, full=True):
+        """
+        Pull every inventory item, plus offers for every SKU (`full`) or only for new and
+        changed SKUs; returns counts of fetched, changed and removed rows.
+        """
+        with self.sync_lock:
+            return self._sync(full)
+
+    def _stored_hashes(self):
+        with self.lock:
+            return dict(self.db.execute("SELECT sku, hash FROM inventory_items").fetchall())
+
+    @tracing.traced("listing_mirror_sync")
+    def _sync(self, full=True):
+        # Rows written through after this point are newer than anything this sync fetches
+        started = time.time()
+        headers = {"Authorization": f"Bearer {get_ebay_access_token()}", "Accept": "application/json"}
+        items = self.fetch_items(headers)
+        if full:
+            skus = [item["sku"] for item in items]
+        else:
+            stored = self._stored_hashes()
+            skus = [item["sku"] for item in items if stored.get(item["sku"]) != _hash(item)]
+        offers = self.fetch_offers(skus, headers)
+        synced_at = time.time()
+        with self.lock, self.db:
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT INTO inventory_items VALUES (?, ?, ?, ?, ?) ON CONFLICT (sku) DO UPDATE SET "
+                "title = excluded.title, data = excluded.data, hash = excluded.hash, synced_at = excluded.synced_at "
+                "WHERE inventory_items.hash != excluded.hash AND inventory_items.synced_at < ?",
+                [(*_item_row(item, synced_at), started) for item in items],
+            )
+            self.db.executemany(
+                "INSERT INTO offers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (offer_id) DO UPDATE SET "
+                "sku = excluded.sku, status = excluded.status, format = excluded.format, price = excluded.price, "
+                "listing_id = excluded.listing_id, data = excluded.data, hash = excluded.hash, "
+                "synced_at = excluded.synced_at WHERE offers.hash != excluded.hash AND offers.synced_at < ?",
+                [(*_offer_row(offer, synced_at), started) for offer in offers],
+            )
+            changed = self.db.total_changes - before
+            removed = self._remove_missing("inventory_items", "sku", [item["sku"] for item in items], started)
+            # Offers are only known to be gone for the SKUs whose offers were fetched
+            removed += self._remove_missing(
+                "offers", "offer_id", [str(offer["offerId"]) for offer in offers], started, None if full else skus,
+            )
+            removed += self.db.execute(
+                "DELETE FROM offers WHERE sku NOT IN (SELECT sku FROM inventory_items) AND synced_at < ?", (started,),
+            ).rowcount
+        self.last_sync = synced_at
+        if full:
+            self.last_full_sync = synced_at
+        console.info(f"✅ Listing mirror {'full' if full else 'incremental'} sync: {len(items)} items, "
+                     f"{len(offers)} offers for {len(skus)} SKUs, {changed} changed, {removed} removed.")
+        return {"full": full, "items": len(items), "offer_skus": len(skus), "offers": len(offers),
+                "changed": changed, "removed": removed}
+
+    def _fill_keys(self, table, keys):
+        self.db.execute(f"CREATE TEMP TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY)")
+        self.db.execute(f"DELETE FROM {table}")
+        self.db.executemany(f"INSERT OR IGNORE INTO {table} VALUES (?)", [(key,) for key in keys])
+
+    def _remove_missing(self, table, column, keys, started, skus=None):
+        """
+        Delete rows the sync did not fetch, except rows written through since it started.
+        With `skus`, only rows for those SKUs are candidates.
+        """
+        self._fill_keys("seen_keys", keys)
+        where = f"{column} NOT IN (SELECT key FROM seen_keys) AND synced_at < ?"
+        if skus is not None:
+            self._fill_keys("scope_keys", skus)
+            where += " AND sku IN (SELECT key FROM scope_keys)"
+        return self.db.execute(f"DELETE FROM {table} WHERE {where}", (started,)).rowcount
+
+    def _background_sync(self):
+        full = self.last_full_sync is None or time.time() - self.last_full_sync > settings.LISTING_MIRROR_FULL_SYNC_SECONDS
+        try:
+            self.sync(full)
+        except Exception as e:
+            console.error(f"❌ Listing mirror refresh failed: {e}")
+        finally:
+            self.refreshing = False
+
+    def ensure_fresh(self):
+        """Sync now if the mirror has never synced; refresh in the background once it is stale."""
+        if self.last_sync is None:
+            # Checked again under the lock so concurrent cold reads share one sync
+            with self.sync_lock:
+                if self.last_sync is None:
+                    self._sync()
+            return
+        if time.time() - self.last_sync > settings.LISTING_MIRROR_REFRESH_SECONDS and not self.refreshing:
+            self.refreshing = True
+            threading.Thread(target=self._background_sync, daemon=True).start()
+
+    # -- write-through ------------------------------------------------------
+
+    def put_item(self, item):
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO inventory_items VALUES (?, ?, ?, ?, ?)", _item_row(item, time.time()))
+
+    def put_offer(self, offer):
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO offers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            _offer_row(offer, time.time()))
+
+    def update_offer(self, offer_id, **changes):
+        """Merge fields into a mirrored offer (e.g. status after publish)."""
+        with self.lock:
+            row = self.db.execute("SELECT data FROM offers WHERE offer_id = ?", (str(offer_id),)).fetchone()
+        if row is not None:
+            self.put_offer({**json.loads(row[0]), **changes})
+
+    # -- reads ----------------------------------------------------------------
+
+    def get_item(self, sku):
+        with self.lock:
+            row = self.db.execute("SELECT data FROM inventory_items WHERE sku = ?", (sku,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _page(self, sql, where, params, limit, offset):
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        with self.lock:
+            total = self.db.execute(f"SELECT COUNT(*) FROM ({sql}{clause})", params).fetchone()[0]
+            rows = self.db.execute(f"{sql}{clause} LIMIT ? OFFSET ?", [*params, limit, offset]).fetchall()
+        return total, [json.loads(row[0]) for row in rows]
+
+    def list_offers(self, status=None, format="FIXED_PRICE", q=None, min_price=None, max_price=None,
+                    limit=100, offset=0):
+        where, params = [], []
+        for column, value in (("o.status", status), ("o.format", format)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if q:
+            where.append("(i.title LIKE ? OR o.sku LIKE ?)")
+            params += [f"%{q}%", f"%{q}%"]
+        if min_price is not None:
+            where.append("o.price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            where.append("o.price <= ?")
+            params.append(max_price)
+        sql = "SELECT o.data FROM offers o LEFT JOIN inventory_items i ON i.sku = o.sku"
+        total, offers = self._page(sql, where, params, limit, offset)
+        return {"total": total, "limit": limit, "offset": offset, "offers": offers}
+
+    def list_drafts(self, q=None, limit=100, offset=0):
+        """Inventory items without a published offer."""
+        where = ["NOT EXISTS (SELECT 1 FROM offers o WHERE o.sku = i.sku AND o.status = 'PUBLISHED')"]
+        params = []
+        if q:
+            where.append("(i.title LIKE ? OR i.sku LIKE ?)")
+            params += [f"%{q}%", f"%{q}%"]
+        total, items = self._page("SELECT i.data FROM inventory_items i", where, params, limit, offset)
+        return {"total": total, "limit": limit, "offset": offset, "inventoryItems": items}
+
+
+def fetch_item(sku):
+    """Read-through for a SKU the mirror has not seen yet; returns (status_code, body)."""
+    headers = {"Authorization": f"Bearer {get_ebay_access_token()}", "Accept": "application/json"}
+    response = ebay_request("inventory_item", "GET", f"{settings.EBAY_API_BASE}/sell/inventory/v1/inventory_item/{sku}",
+                            headers=headers)
+    body = response.json()
+    if response.status_code == 200:
+        mirror.put_item({**body, "sku": body.get("sku", sku)})
+    return response.status_code, body
+
+
+def get_listing(sku):
+    """Mirrored inventory item, falling back to eBay (and mirroring it) on a miss."""
+    item = mirror.get_item(sku)
+    metrics.record_cache("listing_mirror", item is not None)
+    if item is not None:
+        return 200, item
+    return fetch_item(sku)
+
+
+mirror = ListingMirror(settings.LISTING_MIRROR_PATH)
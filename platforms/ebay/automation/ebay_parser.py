@@ -0,0 +1,52 @@
+import re
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+from utils.log_manager import console
+from utils.results import SoldItem
+
+# Kept free of driver imports: the scrape engine runs parse_page in worker processes
+
+ITEM_ID_RE = re.compile(r"/itm/(?:[^/?]+/)?(\d+)")
+SOLD_DATE_RE = re.compile(r"([A-Z][a-z]{2})\s+(\d{1,2}),\s+(\d{4})")
+CAPTCHA_MARKER = "Please verify you're a human"
+
+
+def parse_sold_date(caption):
+    """Turn a "Sold  Oct 3, 2026" caption into an ISO date string."""
+    match = SOLD_DATE_RE.search(caption or "")
+    if not match:
+        return None
+    try:
+        return datetime.strptime(" ".join(match.groups()), "%b %d %Y").date().isoformat()
+    except ValueError:
+        return None
+
+
+def parse_page(html_source):
+    soup = BeautifulSoup(html_source, "html.parser")
+    local_results = []
+
+    for item in soup.select(".s-item"):
+        try:
+            title_elem = item.select_one(".s-item__title > span") or item.select_one(".s-item__title")
+            title = title_elem.get_text(strip=True) if title_elem else "No Title"
+            price_elem = item.select_one(".s-item__price")
+            price_text = price_elem.get_text(strip=True) if price_elem else "No Price"
+            price_value = float(price_text.replace("$", "").replace(",", "")) if price_text.startswith("$") else None
+            image_elem = item.select_one(".s-item__image img")
+            image_url = image_elem.get("src") if image_elem else "No Image"
+            link_elem = item.select_one(".s-item__link")
+            item_url = link_elem.get("href") if link_elem else "No Link"
+            sold_item = SoldItem(title, price_text, price_value, image_url, item_url)
+            item_id = ITEM_ID_RE.search(item_url)
+            sold_item.item_id = item_id.group(1) if item_id else None
+            condition_elem = item.select_one(".s-item__subtitle .SECONDARY_INFO")
+            sold_item.condition = condition_elem.get_text(strip=True) if condition_elem else None
+            sold_elem = item.select_one(".s-item__caption--signal")
+            sold_item.sold_at = parse_sold_date(sold_elem.get_text(" ", strip=True)) if sold_elem else None
+            local_results.append(sold_item)
+        except Exception as e:
+            console.error(f"Skipping item due to error: {e}")
+
+    return local_results
@@ -1,15 +1,12 @@
 import os
-import queue
 import threading
-import time
 import urllib.parse
-from botasaurus_driver import driver
 from botasaurus_driver.core import config
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
-from utils import settings
+from driver.driver_pool import DriverPool
+from platforms.ebay.automation import ebay_parser
+from utils import metrics, settings
 from utils.log_manager import console
-from utils.utils import detect_price_outliers
+from utils.scrape_engine import PlatformParser
 
 def get_fixed_linux_executable_path():
     """Determines the Chrome executable to use."""
@@ -31,129 +28,65 @@ def get_fixed_linux_executable_path():
 
 config.get_linux_executable_path = get_fixed_linux_executable_path
 
-class EbayScraper:
+# Friendly names accepted alongside eBay's numeric LH_ItemCondition codes
+EBAY_CONDITIONS = {"new": "1000", "open_box": "1500", "refurbished": "2500", "used": "3000", "for_parts": "7000"}
+EBAY_BUYING_FORMATS = {"bin": "LH_BIN", "auction": "LH_Auction", "offer": "LH_BO"}
+EBAY_SORTS = {"best_match": "12", "ended_recent": "13", "price_asc": "15", "price_desc": "16"}
+
+class EbayScraper(PlatformParser):
+    name = "ebay"
+    label = "eBay"
+    blocked_marker = ebay_parser.CAPTCHA_MARKER
+    parse = staticmethod(ebay_parser.parse_page)
+
     def __init__(self):
         self.base_url = "https://www.ebay.com/sch/i.html"
         self.lock = threading.Lock()
-        self.driver_pool = queue.Queue()
-        self.results = []
-        self.prices = []
-        self._initialize_drivers()
-
-    def _initialize_drivers(self, count=None):
-        num_drivers = count or getattr(settings, "SCRAPER_NUM_DRIVERS", 3)
-        console.info(f"Spawning {num_drivers} persistent drivers...")
-        for _ in range(num_drivers):
-            try:
-                user_agent = UserAgent().random if hasattr(UserAgent(), 'random') else 'Mozilla/5.0'
-                bot = driver.Driver(user_agent=user_agent, headless=True)
-                self.driver_pool.put(bot)
-            except Exception as e:
-                console.error(f"❌ Failed to initialize driver: {e}")
-
-    def get_driver(self):
-        with self.lock:
-            if self.driver_pool.empty():
-                console.error("⚠️ Driver pool empty. Attempting to re-initialize...")
-                self._initialize_drivers(count=3)
-
-            try:
-                return self.driver_pool.get_nowait()
-            except Exception as e:
-                console.error(f"🚨 Failed to acquire driver: {e}")
-                return None
-                self.initialize_drivers(count=3)
-
-            try:
-                driver = self.driver_pool.get_nowait()
-                return driver
-            except Exception as e:
-                console.error(f"🚨 Failed to acquire driver: {e}")
-                return None
-
-    def scrape_page(self, query, condition="", specifics="", page=1, exclude_parts=True):
-        condition_filter = f"&LH_ItemCondition={condition}" if condition else ""
-        specifics_filter = f"&_sop=12&{specifics}" if specifics else ""
-        url = f"{self.base_url}?_nkw={query}&LH_Sold=1&LH_Complete=1{condition_filter}{specifics_filter}&_pgn={page}"
-
-        try:
-            bot = self.driver_pool.get(timeout=10)
-        except queue.Empty:
-            console.error("No available drivers in pool.")
-            return
-
-        for attempt in range(3):
-            try:
-                bot.get(url)
-                bot.wait_for_element(".s-item")
-                html_source = bot.page_html
-                break
-            except Exception as e:
-                console.error(f"Error fetching page {page} (Attempt {attempt + 1}): {e}")
-                time.sleep(2 ** attempt)
-        else:
-            console.error(f"❌ Failed to fetch page {page} after multiple attempts.")
-            return
-
-        if "Please verify you're a human" in html_source:
-            console.warning("🚨 CAPTCHA detected! Retrying after 10 seconds...")
-            time.sleep(10)
-            return self.scrape_page(query, condition, specifics, page, exclude_parts)
-
-        soup = BeautifulSoup(html_source, "html.parser")
-        local_results = []
-        local_prices = []
-
-        for item in soup.select(".s-item"):
-            try:
-                title_elem = item.select_one(".s-item__title > span") or item.select_one(".s-item__title")
-                title = title_elem.get_text(strip=True) if title_elem else "No Title"
-                price_elem = item.select_one(".s-item__price")
-                price_text = price_elem.get_text(strip=True) if price_elem else "No Price"
-                price_value = float(price_text.replace("$", "").replace(",", "")) if price_text.startswith("$") else None
-                local_prices.append(price_value)
-                image_elem = item.select_one(".s-item__image img")
-                image_url = image_elem.get("src") if image_elem else "No Image"
-                link_elem = item.select_one(".s-item__link")
-                item_url = link_elem.get("href") if link_elem else "No Link"
-                local_results.append({
-                    "title": title,
-                    "price": price_text,
-                    "price_value": price_value,
-                    "image_url": image_url,
-                    "item_url": item_url,
-                    "display_image": f"![Image]({image_url})",
-                })
-            except Exception as e:
-                console.error(f"Skipping item due to error: {e}")
-
-        with self.lock:
-            self.results.extend(local_results)
-            self.prices.extend(local_prices)
-
-    def scrape_ebay_sold(self, query, condition="", specifics="", min_price=None, max_price=None, exclude_parts=True):
+        self.metrics = metrics.page_metrics("ebay")
+        self.driver_pool = DriverPool("ebay")
+
+    def build_url(self, query, condition="", specifics="", page=1, min_price=None, max_price=None,
+                  buying_format=None, sort=None):
+        """Sold-listings search URL with the filters eBay can apply server-side."""
+        params = f"?_nkw={query}&LH_Sold=1&LH_Complete=1"
+        if condition:
+            codes = [EBAY_CONDITIONS.get(part.strip().lower(), part.strip()) for part in str(condition).split(",")]
+            params += f"&LH_ItemCondition={'%7C'.join(codes)}"
+        if min_price is not None:
+            params += f"&_udlo={min_price:.2f}"
+        if max_price is not None:
+            params += f"&_udhi={max_price:.2f}"
+        if buying_format in EBAY_BUYING_FORMATS:
+            params += f"&{EBAY_BUYING_FORMATS[buying_format]}=1"
+        if sort in EBAY_SORTS:
+            params += f"&_sop={EBAY_SORTS[sort]}"
+        elif specifics:
+            params += "&_sop=12"
+        if specifics:
+            params += f"&{specifics}"
+        page_size = getattr(settings, "EBAY_ITEMS_PER_PAGE", 240)
+        return f"{self.base_url}{params}&_ipg={page_size}&_pgn={page}"
+
+    def load(self, bot, url):
+        bot.get(url)
+        bot.wait_for_element(".s-item")
+        return bot.page_html
+
+    async def scrape_ebay_sold(self, query, condition="", specifics="", min_price=None, max_price=None,
+                               exclude_parts=True, cluster=False, cluster_stats=False, category=None, include_terms=(),
+                               exclude_terms=(), filter_report=None, buying_format=None, sort=None):
         query_encoded = urllib.parse.quote_plus(query)
         specifics_encoded = urllib.parse.quote_plus(specifics) if specifics else ""
-        self.results = []
-        self.prices = []
-        num_pages = getattr(settings, "SCRAPER_NUM_PAGES", 5)
-        threads = []
-        for page in range(1, num_pages + 1):
-            thread = threading.Thread(target=self.scrape_page, args=(query_encoded, condition, specifics_encoded, page, exclude_parts))
-            threads.append(thread)
-            thread.start()
-        for thread in threads:
-            thread.join()
-        self.results = detect_price_outliers(self.results)
-        return self.results
-
-    async def shutdown_all(self):
-        with self.lock:
-            while not self.driver_pool.empty():
-                try:
-                    bot = self.driver_pool.get()
-                    bot.quit()
-                except Exception as e:
-                    console.error(f"Failed to shutdown driver: {e}")
+        filters = {"min_price": min_price, "max_price": max_price, "buying_format": buying_format, "sort": sort}
+        return await self.scrape_sold(
+            query,
+            lambda page: self.build_url(query_encoded, condition, specifics_encoded, page, **filters),
+            max_pages=getattr(settings, "SCRAPER_NUM_PAGES", 5),
+            page_size=getattr(settings, "EBAY_ITEMS_PER_PAGE", 240),
+            sort=sort, narrowed=bool(condition or specifics or buying_format),
+            min_price=min_price, max_price=max_price, exclude_parts=exclude_parts, cluster=cluster,
+            cluster_stats=cluster_stats, category=category, include_terms=include_terms,
+            exclude_terms=exclude_terms, filter_report=filter_report,
+        )
 
 scraper = EbayScraper()
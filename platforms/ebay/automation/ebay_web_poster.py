@@ -1,31 +1,48 @@
+import asyncio
+import queue
+import re
+import threading
+import time
+import uuid
+
 from botasaurus_driver import Driver
 
-from driver import driver_pool
+from driver.driver_pool import pool
+from utils import settings, tracing
+from utils.log_manager import console
+
+SELL_URL = "https://www.ebay.com/sl/sell"
 
 
 def sanitize_sku(sku):
     """Remove special characters and trim SKU to 50 chars max."""
-    import re
     sku = re.sub(r"[^a-zA-Z0-9]", "", sku)
     return sku[:50]
 
 
-def post_item_stealth(sku, title, price, condition, specifics):
-    """Posts an item to eBay via web automation (no API)."""
-    bot: Driver = driver_pool.get(timeout=10)
-    bot.google_get("https://www.ebay.com/sl/sell")
+@tracing.traced("stealth_post")
+def post_listing(bot: Driver, listing, warm=False):
+    """
+    Fill and submit the sell form for one listing on a leased driver.
+    A warm driver is already inside the seller session, so it reloads the form
+    directly instead of arriving through a fresh Google navigation.
+    """
+    if warm:
+        bot.get(SELL_URL)
+    else:
+        bot.google_get(SELL_URL)
     bot.wait_for_element("input#title")
 
-    bot.type("input#title", title)
-    bot.type("input#price", str(price))
-    bot.type("input#sku", sanitize_sku(sku))
+    bot.type("input#title", listing["title"])
+    bot.type("input#price", str(listing["price"]))
+    bot.type("input#sku", sanitize_sku(listing["sku"]))
 
-    if condition.lower() == "new":
+    if listing.get("condition", "New").lower() == "new":
         bot.click("input#condition-new")
     else:
         bot.click("input#condition-used")
 
-    for key, value in specifics.items():
+    for key, value in (listing.get("specifics") or {}).items():
         selector = f"input[name='{key}']"
         bot.type(selector, value)
 
@@ -34,3 +51,171 @@ def post_item_stealth(sku, title, price, condition, specifics):
 
     return {"success": True, "message": "Item posted successfully via web automation."}
 
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class StealthJob:
+    """A batch of listings and the per-listing outcome of posting them."""
+
+    def __init__(self, listings):
+        self.id = uuid.uuid4().hex
+        self.listings = listings
+        self.results = [None] * len(listings)
+        self.remaining = len(listings)
+        self.created = time.time()
+        self.finished = None
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.waiters = []  # (event loop, future) pairs resolved when the job finishes
+
+    def record(self, index, result):
+        with self.lock:
+            self.results[index] = result
+            self.remaining -= 1
+            if self.remaining != 0:
+                return
+            self.finished = time.time()
+            self.done.set()
+            waiters, self.waiters = self.waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    async def wait(self, timeout):
+        """Wait on the event loop until every listing has a result; False if `timeout` passes first."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self.lock:
+            if self.remaining == 0:
+                return True
+            self.waiters.append((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self.lock:
+                if (loop, future) in self.waiters:
+                    self.waiters.remove((loop, future))
+
+    @property
+    def status(self):
+        if self.remaining == 0:
+            return "completed"
+        return "running" if self.remaining < len(self.listings) else "queued"
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total": len(self.listings),
+            "posted": sum(1 for result in self.results if result and result.get("success")),
+            "failed": sum(1 for result in self.results if result and not result.get("success")),
+            "results": self.results,
+            "created": self.created,
+            "finished": self.finished,
+        }
+
+
+class StealthPostQueue:
+    """
+    Posts queued listings through the stealth driver pool. Each worker leases a
+    driver and keeps posting back-to-back in its seller session until the queue
+    has been idle for STEALTH_SESSION_IDLE_SECONDS, then hands the driver back.
+    """
+
+    def __init__(self, driver_pool, workers=None):
+        self.driver_pool = driver_pool
+        self.num_workers = workers or settings.STEALTH_POST_WORKERS
+        self.tasks = queue.Queue()
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.workers = []
+        self.stopping = threading.Event()
+
+    def submit(self, listings):
+        """Queue a batch of listing dicts and return its job."""
+        job = StealthJob(listings)
+        with self.lock:
+            self._prune()
+            self.jobs[job.id] = job
+            self._start_workers()
+        for index, listing in enumerate(listings):
+            self.tasks.put((job, index, listing))
+        return job
+
+    def get_job(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _prune(self):
+        cutoff = time.time() - settings.STEALTH_JOB_TTL_SECONDS
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished and job.finished < cutoff]:
+            del self.jobs[job_id]
+
+    def _start_workers(self):
+        while len(self.workers) < self.num_workers:
+            worker = threading.Thread(target=self._work, daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def _work(self):
+        while not self.stopping.is_set():
+            try:
+                task = self.tasks.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                bot = self.driver_pool.get(timeout=settings.STEALTH_DRIVER_WAIT_SECONDS)
+            except queue.Empty:
+                console.error("❌ No stealth driver available for queued listing.")
+                job, index, _ = task
+                job.record(index, {"success": False, "message": "No stealth driver available."})
+                continue
+            try:
+                self._run_session(bot, task)
+            finally:
+                self.driver_pool.put(bot)
+
+    def _run_session(self, bot, task):
+        """Post tasks on one driver until the queue goes idle."""
+        warm = False
+        while task is not None:
+            job, index, listing = task
+            try:
+                result = post_listing(bot, listing, warm=warm)
+                warm = True
+            except Exception as e:
+                console.error(f"Botasaurus stealth post failed: {str(e)}")
+                result = {"success": False, "message": str(e)}
+                warm = False  # page state is unknown; start the next listing from a clean navigation
+            job.record(index, result)
+            if self.stopping.is_set():
+                return
+            try:
+                task = self.tasks.get(timeout=settings.STEALTH_SESSION_IDLE_SECONDS)
+            except queue.Empty:
+                task = None
+
+    def shutdown(self):
+        self.stopping.set()
+
+
+stealth_queue = StealthPostQueue(pool)
+
+
+async def post_item_stealth(sku, title, price, condition, specifics):
+    """
+    Queue one listing on the shared stealth queue and wait for it without holding a thread.
+    Returns (job, result); result is None if it is still pending after STEALTH_POST_TIMEOUT_SECONDS,
+    in which case the listing stays queued and the job can be polled.
+    """
+    job = stealth_queue.submit([
+        {"sku": sku, "title": title, "price": price, "condition": condition, "specifics": specifics}
+    ])
+    if not await job.wait(settings.STEALTH_POST_TIMEOUT_SECONDS):
+        return job, None
+    return job, job.results[0]
@@ -10,7 +10,9 @@ import requests
 import time
 from cryptography.fernet import Fernet
 from dotenv import load_dotenv
+from platforms.ebay.api.ebay_client import ebay_request
 from requests_oauthlib import OAuth2Session
+from utils import settings, tracing
 
 # Load environment variables
 load_dotenv()
@@ -19,7 +21,7 @@ CLIENT_ID = os.getenv('EBAY_CLIENT_ID')
 CLIENT_SECRET = os.getenv("EBAY_CLIENT_SECRET")
 REDIRECT_URI = "https://snap-n-sell.duckdns.org/auth/accepted"
 EBAY_AUTH_URL = "https://auth.ebay.com/oauth2/authorize"
-TOKEN_URL = "https://api.ebay.com/identity/v1/oauth2/token"
+TOKEN_URL = f"{settings.EBAY_API_BASE}/identity/v1/oauth2/token"
 SCOPES = " ".join([
     "https://api.ebay.com/oauth/api_scope",
     "https://api.ebay.com/oauth/api_scope/sell.inventory",
@@ -85,6 +87,7 @@ def save_tokens(tokens):
 
 
 
+@tracing.traced("token")
 def get_ebay_access_token():
     """Retrieve a valid access token or force a refresh if invalid."""
     tokens = load_tokens()
@@ -161,7 +164,7 @@ def fetch_tokens(auth_code, state):
     }
 
     for attempt in range(3):
-        response = requests.post(TOKEN_URL, headers=headers, data=data)
+        response = ebay_request("token", "POST", TOKEN_URL, headers=headers, data=data)
         if response.status_code == 200:
             tokens = response.json()
             save_tokens(tokens)
@@ -176,6 +179,7 @@ def fetch_tokens(auth_code, state):
     raise Exception(f"Failed to get tokens after retries: {response.text}")
 
 
+@tracing.traced("token_refresh")
 def refresh_access_token(refresh_token):
     """Refresh the access token using eBay's OAuth2 API."""
     data = {
@@ -190,7 +194,7 @@ def refresh_access_token(refresh_token):
     }
 
     try:
-        response = requests.post(TOKEN_URL, headers=headers, data=data)
+        response = ebay_request("token", "POST", TOKEN_URL, headers=headers, data=data)
         response.raise_for_status()
         token_data = response.json()
 
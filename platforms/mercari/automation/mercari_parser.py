@@ -0,0 +1,135 @@
+import json
+from datetime import datetime, timezone
+
+from bs4 import BeautifulSoup
+from utils.log_manager import console
+from utils.results import SoldItem
+
+# Kept free of driver imports: the scrape engine runs parse_page in worker processes
+
+NEXT_DATA_MARKER = '<script id="__NEXT_DATA__"'
+
+
+def extract_embedded_json(html_source):
+    """Return the page's __NEXT_DATA__ payload, located by string search rather than an HTML parse."""
+    start = html_source.find(NEXT_DATA_MARKER)
+    if start < 0:
+        return None
+    start = html_source.find(">", start) + 1
+    end = html_source.find("</script>", start)
+    if start <= 0 or end < 0:
+        return None
+    try:
+        return json.loads(html_source[start:end])
+    except ValueError:
+        return None
+
+
+def _is_listing(entry):
+    return isinstance(entry, dict) and "id" in entry and "name" in entry and "price" in entry
+
+
+def find_listing_array(payload):
+    """Depth-first search for the first list of listing objects (id, name, price)."""
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            if node and all(_is_listing(entry) for entry in node[:3]):
+                return node
+            stack.extend(reversed(node))
+    return None
+
+
+def embedded_to_item(entry):
+    price = entry.get("price")
+    # Mercari US sends integer prices in cents
+    price_value = price / 100 if isinstance(price, int) else float(price) if price not in (None, "") else None
+    price_text = f"${price_value:,.2f}" if price_value is not None else "No Price"
+
+    image_url = "No Image"
+    thumbnails = entry.get("thumbnails") or [
+        photo.get("thumbnail") or photo.get("imageUrl") for photo in entry.get("photos") or [] if photo
+    ]
+    if thumbnails and thumbnails[0]:
+        image_url = thumbnails[0]
+
+    item_id = str(entry["id"])
+    condition = entry.get("itemCondition")
+    condition = condition.get("name") if isinstance(condition, dict) else condition or entry.get("itemConditionId")
+    # "updated" is the last status change, which for sold listings is the sale
+    sold_at = entry.get("updated")
+    if isinstance(sold_at, (int, float)):
+        sold_at = datetime.fromtimestamp(sold_at, timezone.utc).isoformat()
+
+    item = SoldItem(entry.get("name") or "No Title", price_text, price_value, image_url,
+                    f"https://www.mercari.com/us/item/{item_id}/")
+    item.item_id = item_id
+    item.sold_at = sold_at
+    item.condition = str(condition) if condition is not None else None
+    return item
+
+
+def parse_embedded_items(html_source):
+    """Items from the embedded JSON payload, or None when the page has no usable payload."""
+    payload = extract_embedded_json(html_source)
+    if payload is None:
+        return None
+    entries = find_listing_array(payload)
+    if entries is None:
+        return None
+    local_results = []
+    for entry in entries:
+        try:
+            local_results.append(embedded_to_item(entry))
+        except Exception as e:
+            console.error(f"Skipping embedded item due to error: {e}")
+    return local_results
+
+
+def parse_page_dom(html_source):
+    soup = BeautifulSoup(html_source, "html.parser")
+    local_results = []
+
+    items = soup.select(".items-box")
+    for item in items:
+        try:
+            title_elem = item.select_one(".items-box-name")
+            title = title_elem.get_text(strip=True) if title_elem else "No Title"
+
+            price_elem = item.select_one(".items-box-price")
+            price_text = (
+                price_elem.get_text(strip=True) if price_elem else "No Price"
+            )
+            price_value = None
+            if price_text.startswith("$"):
+                try:
+                    price_value = float(
+                        price_text.replace("$", "").replace(",", "")
+                    )
+                except ValueError:
+                    pass
+
+            image_elem = item.select_one(".items-box-photo img")
+            image_url = image_elem.get("src") if image_elem else "No Image"
+
+            link_elem = item.select_one("a")
+            item_url = (
+                f"https://www.mercari.com{link_elem.get('href')}"
+                if link_elem
+                else "No Link"
+            )
+
+            local_results.append(SoldItem(title, price_text, price_value, image_url, item_url))
+        except Exception as e:
+            console.error(f"Skipping item due to error: {e}")
+
+    return local_results
+
+
+def parse_page(html_source):
+    """Parse a results page, preferring the embedded JSON payload over the DOM."""
+    embedded = parse_embedded_items(html_source)
+    return embedded if embedded is not None else parse_page_dom(html_source)
@@ -1,115 +1,65 @@
 import threading
 import urllib.parse
-import queue
-from botasaurus_driver import driver
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
-from utils.log_manager import console
-from utils.utils import detect_price_outliers
-from utils import settings
+from driver.driver_pool import DriverPool
+from platforms.mercari.automation import mercari_parser
+from platforms.mercari.automation.mercari_parser import NEXT_DATA_MARKER
+from utils.scrape_engine import PlatformParser
+from utils import metrics, settings
 
 
-class MercariScraper:
-    def __init__(self):
-        self.base_url = "https://www.mercari.com/search/"
-        self.lock = threading.Lock()
-        self.driver_pool = queue.Queue()
-        self.results = []
-        self._initialize_drivers()
+# Mercari's search filter values: item condition ids and sortBy codes
+MERCARI_CONDITIONS = {"new": "1", "like_new": "2", "good": "3", "fair": "4", "poor": "5"}
+MERCARI_SORTS = {"best_match": "1", "ended_recent": "2", "price_asc": "3", "price_desc": "4"}
 
-    def _initialize_drivers(self):
-        num_drivers = getattr(settings, "SCRAPER_NUM_DRIVERS", 3)
-        console.info(
-            f"Spawning {num_drivers} persistent Botasaurus drivers for Mercari..."
-        )
-        for _ in range(num_drivers):
-            try:
-                bot = driver.Driver(user_agent=UserAgent().random, headless=True)
-                self.driver_pool.put(bot)
-            except Exception as e:
-                console.error(f"Error initializing a driver: {e}")
-        console.info("All drivers initialized for Mercari scraping.")
-
-    def scrape_page(self, query, page=1):
-        query_encoded = urllib.parse.quote_plus(query)
-        url = f"{self.base_url}?keyword={query_encoded}&status=sold&page={page}"
 
-        try:
-            bot = self.driver_pool.get(timeout=10)
-        except queue.Empty:
-            console.error("No available drivers in pool for Mercari.")
-            return
+class MercariScraper(PlatformParser):
+    name = "mercari"
+    label = "Mercari"
+    parse = staticmethod(mercari_parser.parse_page)
 
-        try:
-            bot.get(url)
+    def __init__(self):
+        self.base_url = "https://www.mercari.com/search/"
+        self.lock = threading.Lock()
+        self.metrics = metrics.page_metrics("mercari")
+        self.driver_pool = DriverPool("mercari")
+
+    def build_url(self, query, page=1, min_price=None, max_price=None, condition=None, sort=None):
+        """Sold-items search URL with the filters Mercari can apply server-side (prices in cents)."""
+        params = f"?keyword={urllib.parse.quote_plus(query)}&status=sold"
+        if min_price is not None:
+            params += f"&minPrice={round(min_price * 100)}"
+        if max_price is not None:
+            params += f"&maxPrice={round(max_price * 100)}"
+        if condition:
+            ids = [MERCARI_CONDITIONS.get(part.strip().lower(), part.strip()) for part in str(condition).split(",")]
+            params += f"&itemConditions={'-'.join(ids)}"
+        if sort in MERCARI_SORTS:
+            params += f"&sortBy={MERCARI_SORTS[sort]}"
+        return f"{self.base_url}{params}&page={page}"
+
+    def load(self, bot, url):
+        bot.get(url)
+        html_source = bot.page_html
+        if NEXT_DATA_MARKER not in html_source:
+            # No server-rendered payload: wait for the client-side render instead
             bot.wait_for_element(".items-box")
             html_source = bot.page_html
-        except Exception as e:
-            console.error(f"Error fetching page {page}: {e}")
-            return
-        finally:
-            self.driver_pool.put(bot)
-
-        soup = BeautifulSoup(html_source, "html.parser")
-        local_results = []
-
-        items = soup.select(".items-box")
-        for item in items:
-            try:
-                title_elem = item.select_one(".items-box-name")
-                title = title_elem.get_text(strip=True) if title_elem else "No Title"
-
-                price_elem = item.select_one(".items-box-price")
-                price_text = (
-                    price_elem.get_text(strip=True) if price_elem else "No Price"
-                )
-                price_value = None
-                if price_text.startswith("$"):
-                    try:
-                        price_value = float(
-                            price_text.replace("$", "").replace(",", "")
-                        )
-                    except ValueError:
-                        pass
-
-                image_elem = item.select_one(".items-box-photo img")
-                image_url = image_elem.get("src") if image_elem else "No Image"
-
-                link_elem = item.select_one("a")
-                item_url = (
-                    f"https://www.mercari.com{link_elem.get('href')}"
-                    if link_elem
-                    else "No Link"
-                )
-
-                local_results.append(
-                    {
-                        "title": title,
-                        "price": price_text,
-                        "price_value": price_value,
-                        "image_url": image_url,
-                        "item_url": item_url,
-                    }
-                )
-            except Exception as e:
-                console.error(f"Skipping item due to error: {e}")
-
-        with self.lock:
-            self.results.extend(local_results)
-
-    def scrape_mercari_sold(self, query, num_pages=3):
-        self.results = []
-        threads = []
-
-        for page in range(1, num_pages + 1):
-            thread = threading.Thread(target=self.scrape_page, args=(query, page))
-            threads.append(thread)
-            thread.start()
-
-        for thread in threads:
-            thread.join()
-
-        return detect_price_outliers(self.results)
-
+        return html_source
+
+    async def scrape_mercari_sold(self, query, num_pages=3, cluster=False, cluster_stats=False, exclude_parts=True,
+                                  category=None, include_terms=(), exclude_terms=(), filter_report=None,
+                                  min_price=None, max_price=None, condition=None, sort=None):
+        """Scrape up to `num_pages` pages (at most MERCARI_MAX_PAGES), stopping early once more pages add nothing."""
+        max_pages = min(num_pages, settings.MERCARI_MAX_PAGES)
+        filters = {"min_price": min_price, "max_price": max_price, "condition": condition, "sort": sort}
+        return await self.scrape_sold(
+            query,
+            lambda page: self.build_url(query, page, **filters),
+            max_pages=max(1, max_pages),
+            sort=sort, narrowed=bool(condition),
+            min_price=min_price, max_price=max_price, exclude_parts=exclude_parts, cluster=cluster,
+            cluster_stats=cluster_stats, category=category, include_terms=include_terms,
+            exclude_terms=exclude_terms, filter_report=filter_report,
+        )
 
 scraper = MercariScraper()
@@ -1,18 +1,55 @@
-import requests
-from fastapi import APIRouter, Query, Request
+from fastapi import APIRouter, Query, Request, Response
 from http.client import HTTPException
+from driver.driver_pool import DriverUnavailable
+from platforms.ebay.api.ebay_client import ebay_request, response_body
+from platforms.ebay.api.listing_mirror import get_listing, mirror
 from platforms.ebay.api.ebay_poster import post_ebay_inventory_item, sanitize_sku, create_ebay_offer, publish_ebay_offer
 from platforms.ebay.automation.ebay_scraper import scraper
-from platforms.ebay.automation.ebay_web_poster import post_item_stealth
+from platforms.ebay.automation.ebay_web_poster import post_item_stealth, stealth_queue
 from platforms.ebay.security.oauth2_manager import auth_accepted, get_ebay_access_token
 from platforms.mercari.automation import mercari_scraper
-from pydantic import BaseModel
-from starlette.responses import RedirectResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from starlette.responses import JSONResponse, RedirectResponse
+from utils import metrics, settings, tracing
+from utils.image_cache import ImageError, content_type, image_cache, rewrite_image_urls, source_url, thumbnail_width
 from utils.log_manager import console
+from utils.price_index import price_index
+from utils.price_trend import TrendRollups, price_trends
+from utils.responses import json_response
+from utils.results import parse_fields, project
+from utils.title_filter import split_terms
 
 router = APIRouter()
 
 
+def driver_unavailable_response():
+    """503 for scrapes that could not lease a browser within their deadline."""
+    return JSONResponse(
+        {"status": "error", "message": "All browsers are busy. Please try again shortly."},
+        status_code=503,
+        headers={"Retry-After": str(settings.DRIVER_RETRY_AFTER_SECONDS)},
+    )
+
+
+def scrape_error_response(platform, error):
+    """502 for scrapes that failed for a reason other than a busy driver pool."""
+    console.error(f"❌ {platform} scrape failed: {error!r}")
+    return JSONResponse(
+        {"status": "error", "message": f"The {platform} scrape failed ({type(error).__name__}). Please try again."},
+        status_code=502,
+    )
+
+
+def mirror_sync_error_response(error):
+    """502 when the listing mirror could not be synced from eBay (e.g. no token yet)."""
+    console.error(f"❌ Listing mirror sync failed: {error}")
+    return JSONResponse(
+        {"status": "error", "message": f"Could not sync listings from eBay: {error}"},
+        status_code=502,
+    )
+
+
 async def capture_state_and_redirect(request: Request):
     """Handles initial state validation and redirects to /auth/accepted."""
     auth_code = request.query_params.get("code")
@@ -33,12 +70,13 @@ async def ebay_auth_accepted(request: Request):
 
 
 @router.get("/sold-items")
-def get_sold_items(
+async def get_sold_items(
+    request: Request,
     q: str = Query(..., title="Search Query", description="Enter eBay search query"),
     condition: str = Query(
         "",
         title="Condition",
-        description="eBay condition filter (e.g., New=1000, Used=3000)",
+        description="eBay condition filter: codes or names, comma-separated (e.g. 1000 or new,open_box)",
     ),
     specifics: str = Query(
         "",
@@ -51,63 +89,246 @@ def get_sold_items(
     max_price: float = Query(
         None, title="Max Price", description="Maximum price filter"
     ),
+    fields: str = Query(
+        None,
+        title="Fields",
+        description="Comma-separated fields to return (e.g. title,price_value,outlier)",
+    ),
+    cluster: bool = Query(
+        False, title="Cluster", description="Group near-duplicate titles and return cluster_id/representative"
+    ),
+    cluster_stats: bool = Query(
+        False, title="Cluster Stats", description="Fit outlier thresholds to one median per cluster"
+    ),
+    collapse: bool = Query(
+        False, title="Collapse", description="Return only one representative item per cluster"
+    ),
+    exclude_parts: bool = Query(
+        True, title="Exclude Parts", description="Drop for-parts/broken/box-only listings before computing stats"
+    ),
+    category: str = Query(
+        None, title="Category", description="Extra title filter terms to apply (phones, consoles, computers)"
+    ),
+    include: str = Query(
+        None, title="Include Terms", description="Comma-separated terms; keep only titles containing one of them"
+    ),
+    exclude: str = Query(
+        None, title="Exclude Terms", description="Comma-separated extra terms that remove a listing"
+    ),
+    thumb: int = Query(
+        None, title="Thumbnail Width", description="Rewrite image_url to a cached /img/ thumbnail of this width"
+    ),
+    buying_format: str = Query(
+        None, title="Buying Format", description="Restrict to bin (Buy It Now), auction or offer (Best Offer)"
+    ),
+    sort: str = Query(
+        None, title="Sort", description="best_match, ended_recent, price_asc or price_desc"
+    ),
 ):
     """API endpoint to fetch sold eBay items."""
     console.info("/Sold-items endpoint called, fetching results.")
+    filter_report = {}
     try:
-        results = scraper.scrape_ebay_sold(q, condition, specifics, min_price, max_price)
-        return results
-    except Exception as e:
+        with tracing.span("scrape_ebay"):
+            results = await scraper.scrape_ebay_sold(
+                q, condition, specifics, min_price, max_price, exclude_parts,
+                cluster=cluster or collapse, cluster_stats=cluster_stats, category=category,
+                include_terms=split_terms(include), exclude_terms=split_terms(exclude), filter_report=filter_report,
+                buying_format=buying_format, sort=sort,
+            )
+    except DriverUnavailable as e:
         console.error(f"Driver error: {str(e)}")
-        return {"status": "error", "message": "Driver pool exhausted or crashed. Please try again shortly."}
-    return results
+        return driver_unavailable_response()
+    except Exception as e:
+        return scrape_error_response("eBay", e)
+    clustered = cluster or cluster_stats or collapse
+    headers = {"X-Title-Filter": "scanned={scanned}, excluded={excluded}, not-included={not_included}".format(
+        **filter_report
+    )} if filter_report else None
+    rows = project(results, parse_fields(fields, clustered), collapse)
+    if thumb:
+        rewrite_image_urls(rows, thumb)
+    return json_response(request, rows, headers=headers)
 
 
 @router.get("/mercari-sold-items")
-def get_mercari_sold_items(
+async def get_mercari_sold_items(
+    request: Request,
     q: str = Query(..., title="Search Query", description="Enter Mercari search query"),
     num_pages: int = Query(
-        3, title="Number of Pages", description="Number of pages to scrape"
+        3, title="Number of Pages",
+        description=f"Maximum number of pages to scrape (capped at {settings.MERCARI_MAX_PAGES}); "
+                    "paging stops early once results stop changing",
+    ),
+    fields: str = Query(
+        None,
+        title="Fields",
+        description="Comma-separated fields to return (e.g. title,price_value,outlier)",
+    ),
+    cluster: bool = Query(
+        False, title="Cluster", description="Group near-duplicate titles and return cluster_id/representative"
+    ),
+    cluster_stats: bool = Query(
+        False, title="Cluster Stats", description="Fit outlier thresholds to one median per cluster"
+    ),
+    collapse: bool = Query(
+        False, title="Collapse", description="Return only one representative item per cluster"
+    ),
+    exclude_parts: bool = Query(
+        True, title="Exclude Parts", description="Drop for-parts/broken/box-only listings before computing stats"
+    ),
+    category: str = Query(
+        None, title="Category", description="Extra title filter terms to apply (phones, consoles, computers)"
+    ),
+    include: str = Query(
+        None, title="Include Terms", description="Comma-separated terms; keep only titles containing one of them"
+    ),
+    exclude: str = Query(
+        None, title="Exclude Terms", description="Comma-separated extra terms that remove a listing"
+    ),
+    thumb: int = Query(
+        None, title="Thumbnail Width", description="Rewrite image_url to a cached /img/ thumbnail of this width"
+    ),
+    min_price: float = Query(
+        None, title="Min Price", description="Minimum price filter"
+    ),
+    max_price: float = Query(
+        None, title="Max Price", description="Maximum price filter"
+    ),
+    condition: str = Query(
+        None, title="Condition", description="Comma-separated: new, like_new, good, fair, poor"
+    ),
+    sort: str = Query(
+        None, title="Sort", description="best_match, ended_recent, price_asc or price_desc"
     ),
 ):
     """API endpoint to fetch sold Mercari items."""
     console.info("/mercari-sold-items endpoint called, fetching results.")
-    results = mercari_scraper.scrape_mercari_sold(q, num_pages)
-    return {"search_query": q, "results": results}
+    filter_report = {}
+    try:
+        with tracing.span("scrape_mercari"):
+            results = await mercari_scraper.scraper.scrape_mercari_sold(
+                q, num_pages, cluster=cluster or collapse, cluster_stats=cluster_stats, exclude_parts=exclude_parts,
+                category=category, include_terms=split_terms(include), exclude_terms=split_terms(exclude),
+                filter_report=filter_report, min_price=min_price, max_price=max_price, condition=condition, sort=sort,
+            )
+    except DriverUnavailable as e:
+        console.error(f"Driver error: {str(e)}")
+        return driver_unavailable_response()
+    except Exception as e:
+        return scrape_error_response("Mercari", e)
+    clustered = cluster or cluster_stats or collapse
+    rows = project(results, parse_fields(fields, clustered), collapse)
+    if thumb:
+        rewrite_image_urls(rows, thumb)
+    return json_response(request, {
+        "search_query": q,
+        "results": rows,
+        "filtered": filter_report,
+    })
+
+
+@router.get("/img/{key}")
+def get_image(
+    key: str,
+    w: int = Query(None, title="Width", description="Thumbnail width in pixels (snapped to a configured size)"),
+):
+    """Serve a listing image from the local cache, fetching and downscaling it on first use."""
+    try:
+        url = source_url(key)
+        with tracing.span("image_cache"):
+            data = image_cache.get(url, thumbnail_width(w))
+    except ImageError as e:
+        return Response(content=str(e), status_code=e.status_code, media_type="text/plain")
+    # Keys are derived from the source URL, so a key's bytes never change
+    return Response(content=data, media_type=content_type(data), headers={
+        "Cache-Control": "public, max-age=31536000, immutable",
+    })
 
 
 # Define the request model properly
 class SellItemRequest(BaseModel):
     sku: str
     title: str
-    price: float
+    price: Optional[float] = None
+    auto_price: bool = False  # price from the comp index; also used when price is omitted
     condition: str = "New"
     specifics: dict = {}
 
 
+@router.get("/price-suggestion")
+async def get_price_suggestion(
+    response: Response,
+    title: str = Query(..., title="Title", description="Listing title or search query to price"),
+    condition: str = Query(None, title="Condition", description="New or Used (any when omitted)"),
+    platform: str = Query("ebay", title="Platform", description="Comp source: ebay or mercari"),
+):
+    """Suggested price from recently scraped sold comps, without a live scrape."""
+    suggestion = price_index.suggest(title, condition, platform)
+    if suggestion is None:
+        response.status_code = 404
+        return {"status": "error", "message": "No sold comps indexed for this title yet; run /sold-items first."}
+    return suggestion
+
+
+def resolve_price(request: SellItemRequest):
+    """Return (price, suggestion); the comp index prices auto_price requests and those without a price."""
+    if not request.auto_price and request.price is not None:
+        return request.price, None
+    suggestion = price_index.suggest(request.title, request.condition)
+    return (suggestion["suggested_price"] if suggestion else None), suggestion
+
+
+NO_PRICE_ERROR = {"status": "error", "message": "No price given and no sold comps indexed for this title."}
+
+
+@router.get("/price-trend")
+async def get_price_trend(
+    response: Response,
+    q: str = Query(..., title="Search Query", description="Query previously scraped via /sold-items or /mercari-sold-items"),
+    platform: str = Query("ebay", title="Platform", description="ebay or mercari"),
+    interval: str = Query("day", title="Interval", description="day or week"),
+    days: int = Query(365, title="Days", description="How far back to report"),
+):
+    """Sold count and median/quartile prices per day or week, from pre-aggregated rollups."""
+    if interval not in TrendRollups.INTERVALS:
+        response.status_code = 400
+        return {"status": "error", "message": f"interval must be one of {', '.join(TrendRollups.INTERVALS)}"}
+    return {"search_query": q, "platform": platform, "interval": interval,
+            "trend": price_trends.trend(q, platform, interval, days)}
+
+
 @router.post("/sell-item")
-async def sell_item(request: SellItemRequest):
+async def sell_item(request: SellItemRequest, response: Response):
     """API endpoint to post an item for sale on eBay."""
     console.info(f"/sell-item endpoint called: {request}")
 
+    price, suggestion = resolve_price(request)
+    if price is None:
+        response.status_code = 422
+        return NO_PRICE_ERROR
+
     sanitized_sku = sanitize_sku(request.sku)
-    response = post_ebay_inventory_item(
+    item_response = post_ebay_inventory_item(
         sanitized_sku,
         request.title,
-        request.price,
+        price,
         request.condition,
         request.specifics,
     )
 
-    if not response:
-        return {"status": "unauthenticated", "response": response.get("response")}
+    if not item_response:
+        return {"status": "unauthenticated", "response": item_response.get("response")}
 
-    offer_response = create_ebay_offer(sanitized_sku, request.price)
+    offer_response = create_ebay_offer(sanitized_sku, price)
     if "offerId" not in offer_response:
         return {"status": "error", "message": "Failed to create offer", "response": offer_response}
 
     publish_response = publish_ebay_offer(offer_response["offerId"])
-    return {"status": "success", "response": publish_response}
+    result = {"status": "success", "response": publish_response}
+    if suggestion is not None:
+        result["price_suggestion"] = suggestion
+    return result
     sku: str
     title: str
     price: float
@@ -116,67 +337,130 @@ async def sell_item(request: SellItemRequest):
 # Clone of SellItemRequest for the stealth route
 
 @router.post("/sell-item-stealth")
-async def sell_item_stealth(request: SellItemRequest):
+async def sell_item_stealth(request: SellItemRequest, response: Response):
     """Post eBay item using full stealth Botasaurus browser automation."""
     console.info("/sell-item-stealth endpoint called")
-    try:
-        result = post_item_stealth(
-            sku=request.sku,
-            title=request.title,
-            price=request.price,
-            condition=request.condition,
-            specifics=request.specifics,
-        )
-        return {"status": "success", "result": result}
-    except Exception as e:
-        console.error(f"Botasaurus stealth post failed: {str(e)}")
-        return {"status": "error", "message": str(e)}
+    price, _ = resolve_price(request)
+    if price is None:
+        response.status_code = 422
+        return NO_PRICE_ERROR
+    job, result = await post_item_stealth(
+        sku=request.sku,
+        title=request.title,
+        price=price,
+        condition=request.condition,
+        specifics=request.specifics,
+    )
+    if result is None:
+        # Still queued: hand back the job so a client polls it instead of re-posting a duplicate
+        response.status_code = 202
+        return {"status": job.status, "job_id": job.id, "status_url": f"/sell-items-stealth/batch/{job.id}"}
+    if not result["success"]:
+        console.error(f"Botasaurus stealth post failed: {result['message']}")
+        return {"status": "error", "message": result["message"]}
+    return {"status": "success", "result": result}
+
+
+class StealthBatchRequest(BaseModel):
+    items: List[SellItemRequest] = Field(..., min_length=1)
+
+
+@router.post("/sell-items-stealth/batch", status_code=202)
+async def sell_items_stealth_batch(request: StealthBatchRequest, response: Response):
+    """Queue listings for stealth posting; poll the returned status URL for progress."""
+    console.info(f"/sell-items-stealth/batch endpoint called with {len(request.items)} items")
+    listings = []
+    for item in request.items:
+        price, _ = resolve_price(item)
+        if price is None:
+            response.status_code = 422
+            return {**NO_PRICE_ERROR, "sku": item.sku}
+        listings.append({**item.model_dump(), "price": price})
+    job = stealth_queue.submit(listings)
+    return {"job_id": job.id, "status": job.status, "status_url": f"/sell-items-stealth/batch/{job.id}"}
 
-@router.get("/listings")
-async def get_active_listings():
-    """Fetch all active eBay listings (not just inventory)."""
-    access_token = get_ebay_access_token()
-    url = "https://api.ebay.com/sell/inventory/v1/offer?format=FIXED_PRICE"
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/json"
-    }
 
-    response = requests.get(url, headers=headers)
-    return response.json()
+@router.get("/sell-items-stealth/batch/{job_id}")
+async def sell_items_stealth_batch_status(job_id: str, response: Response):
+    """Progress and per-listing results of a stealth batch."""
+    job = stealth_queue.get_job(job_id)
+    if job is None:
+        response.status_code = 404
+        return {"status": "error", "message": f"Unknown job {job_id}"}
+    return job.to_dict()
+
+@router.get("/listings")
+def get_active_listings(
+    status: str = Query(None, title="Status", description="Offer status filter (PUBLISHED, UNPUBLISHED)"),
+    q: str = Query(None, title="Search", description="Substring of the title or SKU"),
+    min_price: float = Query(None, title="Min Price"),
+    max_price: float = Query(None, title="Max Price"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    """All fixed-price offers (every page), served from the local listing mirror."""
+    try:
+        mirror.ensure_fresh()
+    except Exception as e:
+        return mirror_sync_error_response(e)
+    return mirror.list_offers(status, "FIXED_PRICE", q, min_price, max_price, limit, offset)
 
 
 @router.get("/drafts")
-async def get_draft_listings():
-    """Fetch all eBay draft listings."""
-    access_token = get_ebay_access_token()
-    url = "https://api.ebay.com/sell/inventory/v1/inventory_item?listingStatus=DRAFT"
-    headers = {"Authorization": f"Bearer {access_token}", "Accept": "application/json"}
+def get_draft_listings(
+    q: str = Query(None, title="Search", description="Substring of the title or SKU"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    """Inventory items with no published offer, served from the local listing mirror."""
+    try:
+        mirror.ensure_fresh()
+    except Exception as e:
+        return mirror_sync_error_response(e)
+    return mirror.list_drafts(q, limit, offset)
 
-    response = requests.get(url, headers=headers)
-    return response.json()
+
+@router.post("/listings/sync")
+def sync_listings():
+    """Re-pull all inventory items and offers into the mirror now."""
+    try:
+        return mirror.sync()
+    except Exception as e:
+        return mirror_sync_error_response(e)
 
 
 @router.put("/modify-listing/{listing_id}")
-async def modify_ebay_listing(listing_id: str, updated_data: dict):
+def modify_ebay_listing(listing_id: str, updated_data: dict):
     """Modify an active eBay listing."""
     access_token = get_ebay_access_token()
-    url = f"https://api.ebay.com/sell/inventory/v1/inventory_item/{listing_id}"
+    url = f"{settings.EBAY_API_BASE}/sell/inventory/v1/inventory_item/{listing_id}"
     headers = {
         "Authorization": f"Bearer {access_token}",
         "Content-Type": "application/json",
         "Accept": "application/json"
     }
 
-    response = requests.put(url, json=updated_data, headers=headers)
-    return response.json()
+    response = ebay_request("inventory_item", "PUT", url, json=updated_data, headers=headers)
+    if response.status_code in (200, 201, 204):
+        mirror.put_item({**updated_data, "sku": listing_id})
+    return response_body(response)
 
 @router.get("/listing/{listing_id}")
-async def get_ebay_listing(listing_id: str):
-    """Fetch details of a specific eBay listing."""
-    access_token = get_ebay_access_token()
-    url = f"https://api.ebay.com/sell/inventory/v1/inventory_item/{listing_id}"
-    headers = {"Authorization": f"Bearer {access_token}", "Accept": "application/json"}
+def get_ebay_listing(listing_id: str, response: Response):
+    """Fetch details of a specific eBay listing (mirror first, eBay on a miss)."""
+    status_code, body = get_listing(listing_id)
+    response.status_code = status_code
+    return body
+
+
+@router.get("/metrics")
+def get_metrics():
+    """Prometheus scrape endpoint for the scrape and sell pipelines."""
+    body, content_type = metrics.render_metrics()
+    return Response(content=body, media_type=content_type)
+
 
-    response = requests.get(url, headers=headers)
-    return response.json()
+@router.get("/debug/slow-requests")
+def get_slow_requests():
+    """The slowest recent requests with their full span trees."""
+    return {"traces": tracing.slowest_traces()}
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from utils import admission
+from utils.admission import AdmissionController, StaleCache, remaining_budget, route_class
+from utils.responses import json_response
+
+
+def fake_request(path="/sold-items", query="q=iphone"):
+    return SimpleNamespace(url=SimpleNamespace(path=path, query=query), headers={})
+
+
+def test_route_class_exact_and_prefix():
+    assert route_class("/sold-items") == "ebay_scrape"
+    assert route_class("/listing/123") == "ebay_api"
+    assert route_class("/price-suggestion") is None
+
+
+def test_queue_full_and_deadline_rejections():
+    async def scenario():
+        controller = AdmissionController("test_queue", concurrency=1, queue_size=1, timeout=0.2)
+        deadline = time.monotonic() + 0.2
+        assert await controller.acquire(deadline) is None
+        waiter = asyncio.ensure_future(controller.acquire(deadline))
+        await asyncio.sleep(0)
+        assert controller.waiting == 1
+        assert await controller.acquire(deadline) == "queue_full"
+        assert await waiter == "deadline"
+        assert controller.waiting == 0
+        controller.release(0.5)
+        assert await controller.acquire(time.monotonic() + 0.2) is None
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.active == 1
+    assert controller.retry_after() == 1
+
+
+def test_retry_after_scales_with_queue():
+    controller = AdmissionController("test_retry", concurrency=2, queue_size=10, timeout=30)
+    controller.service_time = 4.0
+    controller.waiting = 3
+    assert controller.retry_after() == 8
+
+
+def test_remaining_budget_defaults_outside_a_request():
+    assert remaining_budget(10) == 10
+    token = admission.request_deadline.set(time.monotonic() + 2)
+    try:
+        assert 0 < remaining_budget(10) <= 2
+    finally:
+        admission.request_deadline.reset(token)
+
+
+def test_stale_cache_expiry_and_eviction():
+    cache = StaleCache(max_entries=2, max_age=60)
+    cache.put(fake_request(query="q=a"), 200, {}, b"a")
+    cache.put(fake_request(query="q=b"), 200, {}, b"b")
+    cache.put(fake_request(query="q=c"), 200, {}, b"c")
+    assert cache.get(fake_request(query="q=a")) is None
+    assert cache.get(fake_request(query="q=c"))[3] == b"c"
+    cache.max_age = 0
+    time.sleep(0.01)
+    assert cache.get(fake_request(query="q=c")) is None
+
+
+def test_overloaded_scrape_is_served_stale(monkeypatch):
+    monkeypatch.setattr(admission, "stale_cache", StaleCache(8, 60))
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def admit(request: Request, call_next):
+        return await admission.admit(request, call_next)
+
+    @app.get("/sold-items")
+    async def sold_items(request: Request, q: str):
+        return json_response(request, {"search_query": q})
+
+    client = TestClient(app)
+    fresh = client.get("/sold-items?q=iphone")
+    assert fresh.status_code == 200 and "x-cache" not in fresh.headers
+
+    async def overloaded(deadline):
+        return "queue_full"
+
+    monkeypatch.setattr(admission.controllers["ebay_scrape"], "acquire", overloaded)
+    stale = client.get("/sold-items?q=iphone")
+    assert stale.status_code == 200
+    assert stale.headers["x-cache"] == "STALE"
+    assert stale.json() == fresh.json()
+
+    shed = client.get("/sold-items?q=ipad")
+    assert shed.status_code == 429
+    assert "retry-after" in shed.headers
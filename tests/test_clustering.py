@@ -0,0 +1,50 @@
+from utils.clustering import cluster_items, cluster_median_prices
+
+
+def item(title, price):
+    return {"title": title, "price_value": price}
+
+
+def test_storage_variants_stay_in_separate_clusters():
+    items = [
+        item("Apple iPhone 12 64GB Black Unlocked", 250.0),
+        item("Unlocked Apple iPhone 12 64GB Black", 260.0),
+        item("Apple iPhone 12 128GB Black Unlocked", 320.0),
+        item("Apple iPhone 12 128GB Black Unlocked", 330.0),
+    ]
+    clusters = cluster_items(items)
+    assert len(clusters) == 2
+    assert items[0]["cluster_id"] == items[1]["cluster_id"] != items[2]["cluster_id"] == items[3]["cluster_id"]
+    assert items[0]["cluster_size"] == 2
+
+
+def test_one_representative_per_cluster_closest_to_median():
+    items = [item("Nintendo Switch OLED White", price) for price in (200.0, 290.0, 300.0)]
+    cluster_items(items)
+    assert [member["representative"] for member in items] == [False, True, False]
+
+
+def test_cluster_median_prices_skips_unpriced():
+    assert cluster_median_prices([[item("a", 10.0), item("a", 20.0)], [item("b", None)]]) == [15.0]
+
+
+def test_reordered_relists_share_a_cluster():
+    items = [item("Sony PS5 Console Disc Edition", 400.0), item("Disc Edition Console PS5 Sony", 410.0)]
+    assert len(cluster_items(items)) == 1
+
+
+def test_untitled_items_stay_alone():
+    items = [item("", 10.0), item(None, 12.0), item("Sony PS5 Console", 400.0)]
+    clusters = cluster_items(items)
+    assert len(clusters) == 3
+    assert all(member["cluster_size"] == 1 for member in items)
+
+
+def test_cluster_stats_count_each_product_once():
+    relists = [item("Apple iPhone 12 64GB Black Unlocked", 250.0) for _ in range(30)]
+    others = [item(f"Samsung Galaxy S{n} 128GB Unlocked Phone", 200.0 + n * 40) for n in range(8, 23, 2)]
+    items = relists + others
+    clusters = cluster_items(items)
+    medians = cluster_median_prices(clusters)
+    assert len(medians) == len(clusters) == 1 + len(others)
+    assert medians.count(250.0) == 1
@@ -0,0 +1,20 @@
+from utils.image_cache import image_key, rewrite_image_urls
+
+EBAY_IMAGE = "https://i.ebayimg.com/images/g/abc/s-l225.jpg"
+
+
+def test_rewrites_image_url_and_display_image():
+    rows = rewrite_image_urls([{"image_url": EBAY_IMAGE, "display_image": f"![Image]({EBAY_IMAGE})"}], 200)
+    proxied = f"/img/{image_key(EBAY_IMAGE)}?w=225"
+    assert rows == [{"image_url": proxied, "display_image": f"![Image]({proxied})"}]
+
+
+def test_rewrites_display_image_projected_alone():
+    [row] = rewrite_image_urls([{"display_image": f"![Image]({EBAY_IMAGE})"}])
+    assert row == {"display_image": f"![Image](/img/{image_key(EBAY_IMAGE)})"}
+
+
+def test_leaves_hosts_outside_the_allow_list():
+    other = "https://ir.ebaystatic.com/pictures/aw/pics/s_1x2.gif"
+    rows = [{"image_url": other}, {"display_image": f"![Image]({other})"}, {"image_url": None}]
+    assert rewrite_image_urls([dict(row) for row in rows], 225) == rows
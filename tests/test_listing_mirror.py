@@ -0,0 +1,123 @@
+import collections
+
+import pytest
+import requests
+
+from benchmarks.mock_ebay_api import start_mock_api
+from platforms.ebay.api import listing_mirror
+from platforms.ebay.api.ebay_client import response_body
+from platforms.ebay.api.listing_mirror import ListingMirror
+from utils import settings
+
+
+@pytest.fixture
+def ebay(monkeypatch):
+    """Mock eBay API seeded with 30 items (one offer each), with API calls counted per endpoint."""
+    server, base_url = start_mock_api(seed_items=30)
+    monkeypatch.setattr(settings, "EBAY_API_BASE", base_url)
+    monkeypatch.setattr(listing_mirror, "get_ebay_access_token", lambda: "test-token")
+    calls = collections.Counter()
+    ebay_request = listing_mirror.ebay_request
+
+    def counted(endpoint, *args, **kwargs):
+        calls[endpoint] += 1
+        return ebay_request(endpoint, *args, **kwargs)
+
+    monkeypatch.setattr(listing_mirror, "ebay_request", counted)
+    server.calls = calls
+    server.state = server.RequestHandlerClass.state
+    server.base_url = base_url
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    return ListingMirror(str(tmp_path / "mirror.db"))
+
+
+def add_item(state, sku, title, price="25"):
+    state.items[sku] = {"sku": sku, "product": {"title": title}, "availability": {}}
+    offer_id = str(next(state.ids))
+    state.offers[offer_id] = {
+        "offerId": offer_id, "sku": sku, "format": "FIXED_PRICE", "status": "PUBLISHED",
+        "pricingSummary": {"price": {"value": price, "currency": "USD"}},
+    }
+    return offer_id
+
+
+def test_full_sync_mirrors_items_and_offers(ebay, mirror):
+    result = mirror.sync()
+    assert (result["items"], result["offers"]) == (30, 30)
+    assert ebay.calls["offer"] == 30
+    assert mirror.list_offers(limit=5)["total"] == 30
+    assert mirror.list_offers(min_price=35)["total"] == 5
+    assert mirror.list_drafts()["total"] == 0
+    assert mirror.get_item("SEED00003")["product"]["title"] == "Seed item 3"
+
+
+def test_incremental_sync_fetches_offers_for_new_and_changed_items_only(ebay, mirror):
+    mirror.sync()
+    ebay.calls.clear()
+    ebay.state.items["SEED00004"]["availability"] = {"shipToLocationAvailability": {"quantity": 0}}
+    new_offer = add_item(ebay.state, "NEW1", "New item")
+
+    result = mirror.sync(full=False)
+    assert result["offer_skus"] == 2
+    assert ebay.calls["offer"] == 2
+    assert ebay.calls["inventory_item"] == 1
+    assert {offer["offerId"] for offer in mirror.list_offers(q="NEW1")["offers"]} == {new_offer}
+    assert mirror.list_offers()["total"] == 31
+
+    ebay.calls.clear()
+    assert mirror.sync(full=False)["offer_skus"] == 0
+    assert ebay.calls["offer"] == 0
+
+
+def test_removed_items_and_their_offers_leave_the_mirror(ebay, mirror):
+    mirror.sync()
+    del ebay.state.items["SEED00007"]
+    result = mirror.sync(full=False)
+    assert result["removed"] == 2
+    assert mirror.get_item("SEED00007") is None
+    assert mirror.list_offers(q="SEED00007")["total"] == 0
+
+
+def test_write_through_during_a_sync_is_kept(ebay, mirror, monkeypatch):
+    mirror.sync()
+    fetch_items = mirror.fetch_items
+
+    def fetch_then_write(headers):
+        items = fetch_items(headers)
+        # /sell-item and /modify-listing write through while the sync is in flight
+        mirror.put_item({"sku": "LATE1", "product": {"title": "Posted mid-sync"}})
+        mirror.put_offer({"offerId": "late-offer", "sku": "LATE1", "format": "FIXED_PRICE", "status": "UNPUBLISHED"})
+        mirror.put_item({"sku": "SEED00001", "product": {"title": "Renamed mid-sync"}})
+        return items
+
+    monkeypatch.setattr(mirror, "fetch_items", fetch_then_write)
+    for full in (True, False):
+        mirror.sync(full)
+        assert mirror.get_item("LATE1")["product"]["title"] == "Posted mid-sync"
+        assert mirror.list_offers(q="LATE1")["total"] == 1
+        assert mirror.get_item("SEED00001")["product"]["title"] == "Renamed mid-sync"
+
+
+def test_background_refresh_is_incremental_until_a_full_sync_is_due(ebay, mirror, monkeypatch):
+    mirror.sync()
+    ebay.calls.clear()
+    mirror._background_sync()
+    assert ebay.calls["offer"] == 0
+
+    monkeypatch.setattr(settings, "LISTING_MIRROR_FULL_SYNC_SECONDS", -1)
+    mirror._background_sync()
+    assert ebay.calls["offer"] == 30
+
+
+def test_replacing_an_item_answers_204_without_a_body(ebay):
+    url = f"{ebay.base_url}/sell/inventory/v1/inventory_item/SEED00002"
+    response = requests.put(url, json={"product": {"title": "Updated"}})
+    assert response.status_code == 204
+    assert response_body(response) == {}
+    created = requests.put(f"{ebay.base_url}/sell/inventory/v1/inventory_item/FRESH1", json={})
+    assert created.status_code == 201
@@ -0,0 +1,59 @@
+import asyncio
+
+from utils.utils import paginate_adaptively
+
+
+def run(pages, max_pages=10, **kwargs):
+    fetched = []
+
+    async def fetch_page(page):
+        fetched.append(page)
+        return pages(page)
+
+    results = asyncio.run(paginate_adaptively(fetch_page, max_pages, **kwargs))
+    return results, fetched
+
+
+def priced(*prices):
+    return [{"price_value": price} for price in prices]
+
+
+def test_short_first_page_is_the_only_page():
+    results, fetched = run(lambda page: priced(1, 2), page_size=5)
+    assert fetched == [1]
+    assert len(results) == 2
+
+
+def test_short_later_page_stops_paging():
+    results, fetched = run(lambda page: priced(*range(page, page + (4 if page < 3 else 1))), tolerance=0)
+    assert fetched == [1, 2, 3]
+    assert len(results) == 9
+
+
+def test_converged_stats_stop_paging():
+    results, fetched = run(lambda page: priced(10, 20, 30, 40), tolerance=0.02)
+    assert fetched == [1, 2]
+    assert len(results) == 8
+
+
+def test_convergence_stop_can_be_disabled():
+    results, fetched = run(lambda page: priced(10, 20, 30, 40), max_pages=3, converge=False)
+    assert fetched == [1, 2, 3]
+
+
+def test_shifting_stats_page_to_the_limit():
+    results, fetched = run(lambda page: priced(*(page * 10 + offset for offset in range(4))), max_pages=4, tolerance=0.02)
+    assert fetched == [1, 2, 3, 4]
+
+
+def test_later_pages_fetched_in_concurrent_waves():
+    results, fetched = run(lambda page: priced(*(page * 10 + offset for offset in range(4))),
+                           max_pages=6, tolerance=0.02, concurrency=2)
+    assert fetched == [1, 2, 3, 4, 5, 6]
+    assert len(results) == 24
+
+
+def test_wave_stops_at_max_pages():
+    results, fetched = run(lambda page: priced(*(page * 10 + offset for offset in range(4))),
+                           max_pages=4, tolerance=0.02, concurrency=3)
+    assert fetched == [1, 2, 3, 4]
@@ -0,0 +1,80 @@
+from utils import settings
+from utils.price_index import PriceIndex, condition_key, title_key
+
+
+def comps(*prices, condition="Used", outlier=False):
+    return [
+        {"item_id": f"{condition}-{price}", "price_value": price, "condition": condition, "outlier": outlier}
+        for price in prices
+    ]
+
+
+def test_title_key_ignores_order_case_and_stopwords():
+    assert title_key("Apple iPhone 12 64GB") == title_key("64gb IPHONE 12 apple, brand new")
+
+
+def test_condition_key_collapses_labels():
+    assert condition_key("Brand New") == "new"
+    assert condition_key("Pre-Owned") == "used"
+    assert condition_key(None) == condition_key("Any") == "any"
+
+
+def test_suggest_summarizes_non_outlier_comps():
+    index = PriceIndex()
+    index.record("ebay", "iphone 12", comps(100.0, 200.0, 300.0) + comps(5000.0, outlier=True))
+    suggestion = index.suggest("iPhone 12", "Used")
+    assert suggestion["suggested_price"] == 200.0
+    assert suggestion["comps"] == 3
+    assert suggestion["condition"] == "used"
+
+
+def test_repeated_scrapes_do_not_double_count_items():
+    index = PriceIndex()
+    index.record("ebay", "iphone 12", comps(100.0, 200.0))
+    index.record("ebay", "iphone 12", comps(100.0, 200.0))
+    assert index.suggest("iphone 12")["comps"] == 2
+
+
+def test_unmatched_condition_reports_the_any_fallback():
+    index = PriceIndex()
+    index.record("ebay", "iphone 12", comps(100.0, 200.0, condition="Used"))
+    suggestion = index.suggest("iphone 12", "New")
+    assert suggestion["condition"] == "any"
+    assert suggestion["comps"] == 2
+
+
+def test_listing_title_falls_back_to_most_specific_query():
+    index = PriceIndex()
+    index.record("ebay", "iphone", comps(50.0))
+    index.record("ebay", "iphone 12", comps(200.0))
+    index.record("ebay", "iphone 12 128gb", comps(300.0))
+    suggestion = index.suggest("Apple iPhone 12 64GB Black Unlocked")
+    assert suggestion["key"] == "12 iphone"
+    assert suggestion["suggested_price"] == 200.0
+
+
+def test_fallback_lookups_are_bounded(monkeypatch):
+    index = PriceIndex()
+    index.record("ebay", "black unlocked apple iphone 12 64gb", comps(300.0))
+    index.record("ebay", "smartphone case", comps(10.0))
+    title = "Apple iPhone 12 64GB Black Unlocked Smartphone"
+    assert index.suggest(title)["suggested_price"] == 300.0
+    monkeypatch.setattr(settings, "PRICE_INDEX_MAX_SUBSET_LOOKUPS", 1)
+    assert index.suggest(title) is None
+
+
+def test_unknown_title_and_platform_miss():
+    index = PriceIndex()
+    index.record("ebay", "iphone 12", comps(200.0))
+    assert index.suggest("Nintendo Switch") is None
+    assert index.suggest("iphone 12", platform="mercari") is None
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "index.json")
+    index = PriceIndex()
+    index.record("ebay", "iphone 12", comps(100.0, 200.0, 300.0))
+    index.save(path)
+    restored = PriceIndex()
+    restored.load(path)
+    assert restored.suggest("Apple iPhone 12 64GB")["suggested_price"] == 200.0
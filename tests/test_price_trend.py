@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+from utils import settings
+from utils.price_trend import QuantileSketch, TrendRollups, week_start
+
+
+def sold(item_id, price, days_ago=0, outlier=False):
+    day = date.today() - timedelta(days=days_ago)
+    return {"item_id": item_id, "price_value": price, "sold_at": f"{day.isoformat()}T12:00:00Z", "outlier": outlier}
+
+
+def test_sketch_quantiles_within_accuracy():
+    sketch = QuantileSketch()
+    for price in range(1, 101):
+        sketch.add(float(price))
+    assert abs(sketch.quantile(0.5) - 50.5) / 50.5 <= 2 * settings.TREND_SKETCH_ACCURACY
+    assert sketch.summary()["count"] == 100
+
+
+def test_rescraped_items_are_counted_once():
+    trends = TrendRollups()
+    items = [sold("a", 100.0), sold("b", 200.0)]
+    trends.record("ebay", "iphone 12", items)
+    trends.record("ebay", "iPhone 12", items + [sold("c", 300.0)])
+    [today] = trends.trend("iphone 12")
+    assert today["count"] == 3
+
+
+def test_undated_and_outlier_items_are_skipped():
+    trends = TrendRollups()
+    trends.record("ebay", "iphone 12", [
+        sold("a", 100.0), sold("b", 9000.0, outlier=True), {"item_id": "c", "price_value": 120.0},
+    ])
+    assert [period["count"] for period in trends.trend("iphone 12")] == [1]
+
+
+def test_weekly_rollup_merges_days():
+    trends = TrendRollups()
+    monday = week_start(date.today())
+    items = [sold(str(n), 100.0 + n, days_ago=(date.today() - monday).days) for n in range(3)]
+    items.append(sold("older", 50.0, days_ago=(date.today() - monday).days + 7))
+    trends.record("ebay", "iphone 12", items)
+    weeks = trends.trend("iphone 12", interval="week")
+    assert [week["count"] for week in weeks] == [1, 3]
+    assert weeks[-1]["period"] == monday.isoformat()
+
+
+def test_sales_past_retention_expire(monkeypatch):
+    monkeypatch.setattr(settings, "TREND_RETENTION_DAYS", 30)
+    trends = TrendRollups()
+    trends.record("ebay", "iphone 12", [sold("old", 100.0, days_ago=60), sold("new", 200.0)])
+    assert [period["count"] for period in trends.trend("iphone 12", days=365)] == [1]
+
+    trends.record("ebay", "iphone 12", [sold("aging", 150.0, days_ago=20)])
+    key = ("ebay", "12 iphone")
+    assert set(trends.seen[key]) == {"new", "aging"}
+    monkeypatch.setattr(settings, "TREND_RETENTION_DAYS", 10)
+    trends.record("ebay", "iphone 12", [])
+    assert set(trends.seen[key]) == {"new"}
+    assert all(period >= week_start(date.today() - timedelta(days=10)) for period in trends.rollups[key]["day"])
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "trends.json")
+    trends = TrendRollups()
+    trends.record("mercari", "switch oled", [sold("a", 250.0), sold("b", 270.0)])
+    trends.save(path)
+    restored = TrendRollups()
+    restored.load(path)
+    assert restored.trend("switch oled", platform="mercari") == trends.trend("switch oled", platform="mercari")
+    restored.record("mercari", "switch oled", [sold("a", 250.0)])
+    assert restored.trend("switch oled", platform="mercari")[0]["count"] == 2
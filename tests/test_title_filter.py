@@ -0,0 +1,35 @@
+from utils.title_filter import TitleFilter, filter_titles, split_terms
+
+
+def titles(items):
+    return [item["title"] for item in items]
+
+
+def test_longest_exclusion_term_is_reported():
+    kept, report = TitleFilter(["broken", "broken screen"], []).apply([{"title": "iPhone 12 Broken  Screen"}])
+    assert kept == []
+    assert report["matches"] == {"broken screen": 1}
+
+
+def test_exclusion_wins_over_inclusion():
+    items = [{"title": "PS5 console broken"}, {"title": "PS5 console"}, {"title": "PS5 controller"}]
+    kept, report = TitleFilter(["broken"], ["console"]).apply(items)
+    assert titles(kept) == ["PS5 console"]
+    assert report["excluded"] == 1
+    assert report["not_included"] == 1
+
+
+def test_terms_match_whole_words_only():
+    items = [{"title": "Unbroken seal iPhone"}, {"title": "Lot of 3 phones"}, {"title": "Slot of fame"}]
+    assert titles(filter_titles(items, exclude_terms=("broken",))) == ["Unbroken seal iPhone", "Slot of fame"]
+
+
+def test_exclude_parts_toggles_default_terms():
+    items = [{"title": "iPhone 12 for parts"}, {"title": "iPhone 12 128GB"}]
+    assert titles(filter_titles(items)) == ["iPhone 12 128GB"]
+    assert titles(filter_titles(items, exclude_parts=False)) == titles(items)
+
+
+def test_split_terms():
+    assert split_terms(" a, b ,,c ") == ("a", "b", "c")
+    assert split_terms(None) == ()
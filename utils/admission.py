@@ -0,0 +1,165 @@
+import asyncio
+import contextvars
+import math
+import time
+from collections import OrderedDict
+
+from starlette.responses import JSONResponse, Response
+
+from utils import metrics, settings
+from utils.log_manager import console
+
+# Monotonic deadline of the request being served, for code that blocks (e.g. driver leases)
+request_deadline = contextvars.ContextVar("request_deadline", default=None)
+
+
+def remaining_budget(default):
+    """Seconds left before the current request's deadline, or `default` outside admission control."""
+    deadline = request_deadline.get()
+    if deadline is None:
+        return default
+    return max(0.0, deadline - time.monotonic())
+
+
+class AdmissionController:
+    """
+    Bounded concurrency plus a bounded wait queue for one class of routes.
+    Requests beyond the queue are turned away immediately instead of tying up
+    a worker thread until the driver pool times them out.
+    """
+
+    def __init__(self, name, concurrency, queue_size, timeout, stale=False):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.stale = stale
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.service_time = None  # EWMA of seconds per admitted request
+        metrics.register_admission(self)
+
+    async def acquire(self, deadline):
+        """Wait for a slot; returns None once admitted, else "queue_full" or "deadline"."""
+        if self.semaphore.locked():
+            if self.waiting >= self.queue_size:
+                return "queue_full"
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), timeout=max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                return "deadline"
+            finally:
+                self.waiting -= 1
+        else:
+            await self.semaphore.acquire()
+        self.active += 1
+        return None
+
+    def release(self, elapsed):
+        self.active -= 1
+        self.semaphore.release()
+        self.service_time = elapsed if self.service_time is None else 0.8 * self.service_time + 0.2 * elapsed
+
+    def retry_after(self):
+        """Whole seconds until the current queue should have drained."""
+        per_request = self.service_time or self.timeout
+        return max(1, math.ceil(per_request * (self.waiting + 1) / self.concurrency))
+
+
+class StaleCache:
+    """Last good response per URL for routes that may be answered stale under overload."""
+
+    def __init__(self, max_entries, max_age):
+        self.entries = OrderedDict()
+        self.max_entries = max_entries
+        self.max_age = max_age
+
+    @staticmethod
+    def key(request):
+        return request.url.path, request.url.query, request.headers.get("accept-encoding", "")
+
+    def put(self, request, status_code, headers, body):
+        key = self.key(request)
+        self.entries.pop(key, None)
+        self.entries[key] = (time.time(), status_code, headers, body)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, request):
+        entry = self.entries.get(self.key(request))
+        if entry is None or time.time() - entry[0] > self.max_age:
+            return None
+        return entry
+
+
+def route_class(path):
+    """Admission class for a request path (exact match, or prefix match for keys ending in "/")."""
+    name = settings.ADMISSION_ROUTES.get(path)
+    if name is None:
+        for prefix, candidate in settings.ADMISSION_ROUTES.items():
+            if prefix.endswith("/") and path.startswith(prefix):
+                return candidate
+    return name
+
+
+controllers = {
+    name: AdmissionController(name, **limits) for name, limits in settings.ADMISSION_LIMITS.items()
+}
+stale_cache = StaleCache(settings.ADMISSION_STALE_ENTRIES, settings.ADMISSION_STALE_MAX_AGE)
+
+
+def _reject(request, controller, reason):
+    metrics.ADMISSION_REJECTED.labels(controller.name, reason).inc()
+    retry_after = str(controller.retry_after())
+    entry = stale_cache.get(request) if controller.stale and request.method == "GET" else None
+    if entry is not None:
+        stored_at, status_code, headers, body = entry
+        console.warning(f"⚠️ {controller.name} overloaded ({reason}); serving stale {request.url.path}")
+        return Response(content=body, status_code=status_code, headers={
+            **headers,
+            "Age": str(int(time.time() - stored_at)),
+            "Warning": '110 - "Response is Stale"',
+            "X-Cache": "STALE",
+        })
+    status_code = 429 if reason == "queue_full" else 503
+    return JSONResponse(
+        {"status": "error", "message": f"Server busy ({reason.replace('_', ' ')}); retry after {retry_after}s."},
+        status_code=status_code,
+        headers={"Retry-After": retry_after},
+    )
+
+
+async def admit(request, call_next):
+    """Middleware body: queue or shed the request per its route class, then run it under a deadline."""
+    name = route_class(request.url.path)
+    controller = controllers.get(name)
+    if controller is None:
+        return await call_next(request)
+
+    timeout = controller.timeout
+    try:
+        timeout = min(timeout, float(request.headers["x-request-timeout"]))
+    except (KeyError, ValueError):
+        pass
+    deadline = time.monotonic() + timeout
+
+    reason = await controller.acquire(deadline)
+    if reason is not None:
+        return _reject(request, controller, reason)
+
+    token = request_deadline.set(deadline)
+    start = time.monotonic()
+    try:
+        response = await call_next(request)
+        # Only json_response results carry an ETag; error dicts are never kept for stale serving
+        if controller.stale and request.method == "GET" and response.status_code == 200 and "etag" in response.headers:
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+            stale_cache.put(request, response.status_code, headers, body)
+            response = Response(content=body, status_code=response.status_code, headers=headers)
+        return response
+    finally:
+        request_deadline.reset(token)
+        controller.release(time.monotonic() - start)
@@ -0,0 +1,114 @@
+import random
+import re
+import statistics
+import zlib
+
+from utils import settings, tracing
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _permutations(num_perm):
+    rng = random.Random(1729)  # fixed seed: signatures must be comparable across calls
+    return [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+
+_PERMUTATIONS = _permutations(settings.CLUSTER_NUM_PERM)
+
+
+def title_shingles(title):
+    """
+    Word shingles of a title. Word order is ignored so reshuffled relists still
+    match; tokens with digits (model numbers, storage sizes) count twice so
+    "64GB" vs "128GB" separates variants that otherwise share every word.
+    """
+    tokens = _TOKEN_RE.findall((title or "").lower())
+    return frozenset(tokens + ["#" + token for token in tokens if not token.isalpha()])
+
+
+def _token_hashes(token, cache):
+    hashes = cache.get(token)
+    if hashes is None:
+        value = zlib.crc32(token.encode())
+        hashes = cache[token] = [((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for a, b in _PERMUTATIONS]
+    return hashes
+
+
+def minhash(shingles, cache):
+    """MinHash signature; per-token hash vectors are cached since titles share most words."""
+    if not shingles:
+        return None
+    return list(map(min, zip(*(_token_hashes(token, cache) for token in shingles))))
+
+
+def _find(parents, i):
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+@tracing.traced("clustering")
+def cluster_items(items, threshold=None, bands=None):
+    """
+    Group near-duplicate titles using MinHash signatures and LSH banding:
+    - Items sharing any band bucket are candidates
+    - Candidates are confirmed by exact Jaccard similarity >= threshold
+    - Each bucket is checked against its first member only, so large groups of
+      relists cost linear rather than quadratic time
+    Sets cluster_id, cluster_size and representative (the member priced closest to
+    the cluster median) on every item and returns the clusters as lists of items.
+    """
+    threshold = settings.CLUSTER_SIMILARITY if threshold is None else threshold
+    bands = bands or settings.CLUSTER_BANDS
+    rows = max(1, len(_PERMUTATIONS) // bands)
+
+    cache = {}
+    shingles = [title_shingles(item.get("title")) for item in items]
+    parents = list(range(len(items)))
+    buckets = {}
+
+    for index, item_shingles in enumerate(shingles):
+        signature = minhash(item_shingles, cache)
+        if signature is None:
+            continue
+        for band in range(bands):
+            key = (band, *signature[band * rows:(band + 1) * rows])
+            anchor = buckets.setdefault(key, index)
+            if anchor == index:
+                continue
+            root, anchor_root = _find(parents, index), _find(parents, anchor)
+            if root == anchor_root:
+                continue
+            union = len(item_shingles | shingles[anchor])
+            if union and len(item_shingles & shingles[anchor]) / union >= threshold:
+                parents[max(root, anchor_root)] = min(root, anchor_root)
+
+    groups = {}
+    for index in range(len(items)):
+        groups.setdefault(_find(parents, index), []).append(items[index])
+
+    clusters = list(groups.values())
+    for cluster_id, members in enumerate(clusters):
+        priced = [member for member in members if member.get("price_value") is not None]
+        representative = members[0]
+        if priced:
+            median_price = statistics.median(member["price_value"] for member in priced)
+            representative = min(priced, key=lambda member: abs(member["price_value"] - median_price))
+        for member in members:
+            member["cluster_id"] = cluster_id
+            member["cluster_size"] = len(members)
+            member["representative"] = member is representative
+    return clusters
+
+
+def cluster_median_prices(clusters):
+    """One median price per cluster, for computing stats per product instead of per listing."""
+    medians = []
+    for members in clusters:
+        prices = [member["price_value"] for member in members if member.get("price_value") is not None]
+        if prices:
+            medians.append(statistics.median(prices))
+    return medians
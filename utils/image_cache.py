@@ -0,0 +1,216 @@
+import base64
+import binascii
+import hashlib
+import io
+import os
+import threading
+import urllib.parse
+from collections import OrderedDict
+
+import requests
+
+from utils import metrics, settings
+from utils.log_manager import console
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is in requirements.txt; without it images are cached and served at full size
+    Image = None
+
+
+class ImageError(Exception):
+    """Raised when an image key is invalid or its source cannot be fetched."""
+
+    def __init__(self, message, status_code=502):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def image_key(url):
+    """URL-safe key for a source image URL (the URL itself, so no lookup table is needed)."""
+    return base64.urlsafe_b64encode(url.encode()).decode().rstrip("=")
+
+
+def is_proxied(url):
+    """Whether /img/ will serve this URL (http(s) on an IMAGE_ALLOWED_HOSTS host)."""
+    parsed = urllib.parse.urlparse(url)
+    return parsed.scheme in ("http", "https") and parsed.hostname in settings.IMAGE_ALLOWED_HOSTS
+
+
+def source_url(key):
+    """Decode an image key and check its host is one we proxy."""
+    try:
+        url = base64.urlsafe_b64decode(key + "=" * (-len(key) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise ImageError("Invalid image key", 400) from None
+    if not is_proxied(url):
+        raise ImageError("Image host not allowed", 403)
+    return url
+
+
+def thumbnail_width(width):
+    """Snap a requested width up to the nearest configured thumbnail size (None = original)."""
+    if not width:
+        return None
+    for size in settings.IMAGE_THUMBNAIL_SIZES:
+        if width <= size:
+            return size
+    return settings.IMAGE_THUMBNAIL_SIZES[-1]
+
+
+def _row_image_url(row):
+    """A projected row's source image URL, from image_url or else from the display_image markdown."""
+    url = row.get("image_url")
+    display = row.get("display_image")
+    if not url and display and display.startswith("![Image](") and display.endswith(")"):
+        url = display[len("![Image]("):-1]
+    return url
+
+
+def rewrite_image_urls(rows, width=None):
+    """Point projected result rows at /img/ so clients load cached thumbnails (allowed hosts only)."""
+    suffix = f"?w={thumbnail_width(width)}" if width else ""
+    for row in rows:
+        url = _row_image_url(row)
+        if not url or not is_proxied(url):
+            continue
+        proxied = f"/img/{image_key(url)}{suffix}"
+        if "image_url" in row:
+            row["image_url"] = proxied
+        if "display_image" in row:
+            row["display_image"] = f"![Image]({proxied})"
+    return rows
+
+
+class ImageCache:
+    """
+    Disk cache of source images and their thumbnails, addressed by a hash of the
+    source URL and width. Total size is bounded by IMAGE_CACHE_MAX_BYTES with
+    least-recently-used eviction; concurrent misses for one image fetch it once.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.fetch_locks = {}
+        self.entries = OrderedDict()  # path -> size, least recently used first
+        self.total = 0
+        self._scan()
+
+    def _scan(self):
+        if not os.path.isdir(self.root):
+            return
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(files):
+            self.entries[path] = size
+            self.total += size
+
+    def _path(self, url, width):
+        digest = hashlib.blake2b(f"{url}|{width or 0}".encode(), digest_size=16).hexdigest()
+        return os.path.join(self.root, digest[:2], digest)
+
+    def _read(self, path):
+        with self.lock:
+            if path not in self.entries:
+                return None
+            self.entries.move_to_end(path)
+        try:
+            with open(path, "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            with self.lock:
+                self.total -= self.entries.pop(path, 0)
+            return None
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as file:
+            file.write(data)
+        os.replace(tmp, path)
+        with self.lock:
+            self.total += len(data) - self.entries.pop(path, 0)
+            self.entries[path] = len(data)
+            while self.total > self.max_bytes and len(self.entries) > 1:
+                evicted, size = self.entries.popitem(last=False)
+                self.total -= size
+                try:
+                    os.remove(evicted)
+                except FileNotFoundError:
+                    pass
+
+    def _fetch(self, url):
+        try:
+            with requests.get(url, timeout=settings.IMAGE_FETCH_TIMEOUT, stream=True) as response:
+                if response.status_code != 200 or not response.headers.get("Content-Type", "").startswith("image/"):
+                    raise ImageError(f"Image fetch failed with status {response.status_code}")
+                data = response.raw.read(settings.IMAGE_MAX_SOURCE_BYTES + 1, decode_content=True)
+        except requests.RequestException as e:
+            raise ImageError(f"Image fetch failed: {e}") from None
+        if len(data) > settings.IMAGE_MAX_SOURCE_BYTES:
+            raise ImageError("Source image too large")
+        return data
+
+    def _resize(self, data, width):
+        if Image is None:
+            return data
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                if image.width <= width:
+                    return data
+                image.thumbnail((width, width * 4))
+                if image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+                output = io.BytesIO()
+                image.save(output, "JPEG", quality=settings.IMAGE_JPEG_QUALITY, optimize=True)
+                return output.getvalue()
+        except Exception as e:
+            console.error(f"❌ Could not resize image: {e}")
+            return data
+
+    def get(self, url, width=None):
+        """Return image bytes for `url` at `width`, fetching and resizing on first use."""
+        path = self._path(url, width)
+        data = self._read(path)
+        metrics.record_cache("image", data is not None)
+        if data is not None:
+            return data
+
+        with self.lock:
+            fetch_lock = self.fetch_locks.setdefault(path, threading.Lock())
+        with fetch_lock:
+            data = self._read(path)
+            if data is None:
+                original_path = self._path(url, None)
+                original = self._read(original_path)
+                if original is None:
+                    original = self._fetch(url)
+                    self._write(original_path, original)
+                data = self._resize(original, width) if width else original
+                if data is not original:
+                    self._write(path, data)
+        with self.lock:
+            self.fetch_locks.pop(path, None)
+        return data
+
+
+def content_type(data):
+    """Sniff the image type from its first bytes."""
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:4] == b"GIF8":
+        return "image/gif"
+    return "application/octet-stream"
+
+
+image_cache = ImageCache(settings.IMAGE_CACHE_DIR, settings.IMAGE_CACHE_MAX_BYTES)
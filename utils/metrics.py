@@ -0,0 +1,89 @@
+from functools import lru_cache
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Latency buckets (seconds) sized for browser page loads and eBay API calls
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+PARSE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2)
+ITEM_BUCKETS = (0, 1, 10, 25, 50, 100, 120, 200, 240)
+
+DRIVER_POOL_SIZE = Gauge("price_it_driver_pool_size", "Drivers owned by the pool", ["platform"])
+DRIVER_POOL_LEASED = Gauge("price_it_driver_pool_leased", "Drivers currently leased out", ["platform"])
+DRIVER_POOL_WAITING = Gauge("price_it_driver_pool_waiting", "Callers waiting for a driver", ["platform"])
+
+PAGE_FETCH_SECONDS = Histogram(
+    "price_it_page_fetch_seconds", "Browser page load time per results page", ["platform"], buckets=LATENCY_BUCKETS
+)
+PAGE_PARSE_SECONDS = Histogram(
+    "price_it_page_parse_seconds", "HTML parse time per results page", ["platform"], buckets=PARSE_BUCKETS
+)
+PAGE_ITEMS = Histogram("price_it_page_items", "Items parsed per results page", ["platform"], buckets=ITEM_BUCKETS)
+PAGES_FETCHED = Counter("price_it_pages_fetched_total", "Results pages loaded", ["platform"])
+CAPTCHA_HITS = Counter("price_it_captcha_hits_total", "Results pages that returned a CAPTCHA", ["platform"])
+
+CACHE_REQUESTS = Counter("price_it_cache_requests_total", "Cache lookups by outcome", ["cache", "result"])
+
+TITLE_FILTER_MATCHES = Counter(
+    "price_it_title_filter_matches_total", "Listings removed by the title filter, by matched term", ["term"]
+)
+
+EBAY_API_SECONDS = Histogram(
+    "price_it_ebay_api_seconds", "eBay API call latency", ["endpoint", "status"], buckets=LATENCY_BUCKETS
+)
+
+ADMISSION_ACTIVE = Gauge("price_it_admission_active", "Requests admitted and running", ["route_class"])
+ADMISSION_WAITING = Gauge("price_it_admission_waiting", "Requests queued for admission", ["route_class"])
+ADMISSION_REJECTED = Counter(
+    "price_it_admission_rejected_total", "Requests shed by admission control", ["route_class", "reason"]
+)
+
+REQUEST_SECONDS = Histogram(
+    "price_it_request_seconds", "HTTP request latency per route", ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+
+
+class PageMetrics:
+    """Label-bound metric children for one platform, so hot loops skip label lookups."""
+
+    __slots__ = ("fetch", "parse", "items", "pages", "captchas")
+
+    def __init__(self, platform):
+        self.fetch = PAGE_FETCH_SECONDS.labels(platform)
+        self.parse = PAGE_PARSE_SECONDS.labels(platform)
+        self.items = PAGE_ITEMS.labels(platform)
+        self.pages = PAGES_FETCHED.labels(platform)
+        self.captchas = CAPTCHA_HITS.labels(platform)
+
+
+@lru_cache(maxsize=None)
+def page_metrics(platform):
+    return PageMetrics(platform)
+
+
+@lru_cache(maxsize=None)
+def _cache_counters(cache):
+    return CACHE_REQUESTS.labels(cache, "hit"), CACHE_REQUESTS.labels(cache, "miss")
+
+
+def record_cache(cache, hit):
+    """Count a cache lookup; hit ratio is hit / (hit + miss) per cache."""
+    hits, misses = _cache_counters(cache)
+    (hits if hit else misses).inc()
+
+
+def register_driver_pool(pool):
+    """Export a pool's size, leased and waiting counts, read lazily at scrape time."""
+    DRIVER_POOL_SIZE.labels(pool.platform).set_function(lambda: pool.size)
+    DRIVER_POOL_LEASED.labels(pool.platform).set_function(lambda: pool.leased)
+    DRIVER_POOL_WAITING.labels(pool.platform).set_function(lambda: pool.waiting)
+
+
+def register_admission(controller):
+    """Export an admission controller's running and queued counts."""
+    ADMISSION_ACTIVE.labels(controller.name).set_function(lambda: controller.active)
+    ADMISSION_WAITING.labels(controller.name).set_function(lambda: controller.waiting)
+
+
+def render_metrics():
+    """Return the Prometheus exposition body and its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
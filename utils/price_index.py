@@ -0,0 +1,184 @@
+import json
+import re
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from itertools import combinations
+
+from utils import metrics, settings
+from utils.log_manager import console
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Words that say nothing about which product a title describes
+_STOPWORDS = frozenset((
+    "a", "an", "and", "the", "for", "with", "of", "in", "on", "new", "used", "pre", "owned", "brand",
+    "sealed", "open", "box", "free", "shipping", "fast", "great", "good", "excellent", "condition",
+))
+_NEW_CONDITIONS = ("new", "brand new", "new with tags", "new with box", "new other", "new (other)", "sealed")
+
+
+def title_key(title):
+    """Order-insensitive key of a title's product words ("iPhone 12 64GB" == "64gb iphone 12")."""
+    return " ".join(sorted({token for token in _TOKEN_RE.findall((title or "").lower()) if token not in _STOPWORDS}))
+
+
+def condition_key(condition):
+    """Collapse platform condition labels to "new", "used" or "any"."""
+    condition = " ".join((condition or "").lower().split())
+    if not condition or condition == "any":
+        return "any"
+    return "new" if condition in _NEW_CONDITIONS or condition.startswith("new") else "used"
+
+
+class PriceStats:
+    """Recent outlier-filtered comps for one product key, with the summary precomputed on update."""
+
+    __slots__ = ("prices", "seen", "summary")
+
+    def __init__(self):
+        self.prices = deque(maxlen=settings.PRICE_INDEX_MAX_SAMPLES)
+        self.seen = OrderedDict()
+        self.summary = None
+
+    def add(self, item_key, price):
+        if item_key in self.seen:
+            return False
+        self.seen[item_key] = None
+        if len(self.seen) > settings.PRICE_INDEX_MAX_SAMPLES * 2:
+            self.seen.popitem(last=False)
+        self.prices.append(price)
+        return True
+
+    def summarize(self):
+        prices = sorted(self.prices)
+        n = len(prices)
+        mid = n // 2
+        self.summary = {
+            "suggested_price": round(statistics.median(prices), 2),
+            "low": round(statistics.median(prices[:mid]), 2) if n > 1 else prices[0],
+            "high": round(statistics.median(prices[mid + (n % 2):]), 2) if n > 1 else prices[0],
+            "min": prices[0],
+            "max": prices[-1],
+            "comps": n,
+            "updated_at": time.time(),
+        }
+
+
+class PriceIndex:
+    """
+    Comp prices per (platform, product key, condition), fed by completed scrapes.
+    Lookups are a dict hit on the caller's title key; titles with extra words
+    fall back to the most specific indexed key whose words they all contain,
+    found by probing word subsets of the title rather than scanning keys.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.keys_by_token = {}
+        self.max_key_words = {}  # platform -> word count of its longest key
+
+    def record(self, platform, query, items):
+        """Add a finished scrape's non-outlier prices under the query's key."""
+        key = title_key(query)
+        if not key:
+            return
+        updated = set()
+        with self.lock:
+            for item in items:
+                price = item.get("price_value")
+                if price is None or item.get("outlier"):
+                    continue
+                item_key = item.get("item_id") or item.get("item_url") or item.get("title")
+                for condition in {"any", condition_key(item.get("condition"))}:
+                    entry_key = (platform, key, condition)
+                    stats = self.entries.get(entry_key)
+                    if stats is None:
+                        stats = self.entries[entry_key] = PriceStats()
+                        self._index_key(platform, key)
+                    if stats.add(item_key, price):
+                        updated.add(entry_key)
+            for entry_key in updated:
+                self.entries[entry_key].summarize()
+
+    def _index_key(self, platform, key):
+        words = key.split()
+        for token in words:
+            self.keys_by_token.setdefault((platform, token), set()).add(key)
+        self.max_key_words[platform] = max(self.max_key_words.get(platform, 0), len(words))
+
+    def _candidate_key(self, platform, tokens):
+        """
+        Longest indexed key made only of words from `tokens`. Keys are sorted word
+        lists, so each subset of the title's indexed words is one dict probe; the
+        work depends on the title's length, not on how many keys are indexed.
+        """
+        indexed = [token for token in tokens if (platform, token) in self.keys_by_token]
+        lookups = settings.PRICE_INDEX_MAX_SUBSET_LOOKUPS
+        for size in range(min(len(indexed), self.max_key_words.get(platform, 0)), 0, -1):
+            for words in combinations(indexed, size):
+                key = " ".join(words)
+                if (platform, key, "any") in self.entries:
+                    return key
+                lookups -= 1
+                if lookups <= 0:
+                    return None
+        return None
+
+    def _stats(self, platform, key, condition):
+        """Stats for the condition, else for any condition; returns (stats, matched condition)."""
+        for matched in (condition, "any"):
+            stats = self.entries.get((platform, key, matched))
+            if stats is not None:
+                return stats, matched
+        return None, None
+
+    def suggest(self, title, condition=None, platform="ebay"):
+        """Precomputed comp summary for a listing title, or None when nothing matches."""
+        key = title_key(title)
+        wanted = condition_key(condition)
+        with self.lock:
+            stats, condition = self._stats(platform, key, wanted)
+            if stats is None and key:
+                matched = self._candidate_key(platform, key.split())
+                if matched is not None:
+                    key = matched
+                    stats, condition = self._stats(platform, key, wanted)
+            summary = stats.summary if stats is not None else None
+        metrics.record_cache("price_index", summary is not None)
+        if summary is None:
+            return None
+        return {"key": key, "condition": condition, "platform": platform, **summary}
+
+    def save(self, path):
+        with self.lock:
+            snapshot = [
+                {"platform": platform, "key": key, "condition": condition,
+                 "prices": list(stats.prices), "seen": list(stats.seen)}
+                for (platform, key, condition), stats in self.entries.items()
+            ]
+        with open(path, "w") as file:
+            json.dump(snapshot, file)
+
+    def load(self, path):
+        try:
+            with open(path) as file:
+                snapshot = json.load(file)
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            console.error(f"❌ Could not read price index {path}: {e}")
+            return
+        with self.lock:
+            for entry in snapshot:
+                stats = self.entries[(entry["platform"], entry["key"], entry["condition"])] = PriceStats()
+                stats.prices.extend(entry["prices"])
+                stats.seen.update(dict.fromkeys(entry.get("seen", ())))
+                self._index_key(entry["platform"], entry["key"])
+                if stats.prices:
+                    stats.summarize()
+        console.info(f"✅ Loaded {len(snapshot)} price index entries from {path}")
+
+
+price_index = PriceIndex()
@@ -0,0 +1,162 @@
+import json
+import math
+import threading
+from datetime import date, timedelta
+
+from utils import settings
+from utils.log_manager import console
+from utils.price_index import title_key
+
+_GAMMA = (1 + settings.TREND_SKETCH_ACCURACY) / (1 - settings.TREND_SKETCH_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+class QuantileSketch:
+    """
+    Log-bucketed price histogram (DDSketch style): quantiles are within
+    TREND_SKETCH_ACCURACY relative error and sketches merge by adding counts.
+    """
+
+    __slots__ = ("bins", "count", "_summary")
+
+    def __init__(self, bins=None):
+        self.bins = bins or {}
+        self.count = sum(self.bins.values())
+        self._summary = None
+
+    def add(self, price):
+        index = math.ceil(math.log(max(price, 0.01)) / _LOG_GAMMA)
+        self.bins[index] = self.bins.get(index, 0) + 1
+        self.count += 1
+        self._summary = None
+
+    def quantile(self, q):
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                return round(2 * _GAMMA ** index / (_GAMMA + 1), 2)
+        return None
+
+    def summary(self):
+        """Cached until the next add, so repeated trend queries skip the bin walk."""
+        if self._summary is None:
+            self._summary = {
+                "count": self.count,
+                "median": self.quantile(0.5),
+                "p25": self.quantile(0.25),
+                "p75": self.quantile(0.75),
+            }
+        return self._summary
+
+
+def sold_day(sold_at):
+    """Day a listing sold from its ISO sold_at string, or None."""
+    try:
+        return date.fromisoformat(sold_at[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+class TrendRollups:
+    """
+    Daily and weekly price sketches per (platform, query key), updated as scrapes
+    complete. Each listing is counted once, keyed by item id, so overlapping
+    re-scrapes of the same query do not inflate the counts.
+    """
+
+    INTERVALS = ("day", "week")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rollups = {}  # (platform, key) -> {"day": {date: sketch}, "week": {date: sketch}}
+        self.seen = {}  # (platform, key) -> {item key: sold day}
+
+    def record(self, platform, query, items):
+        """Add dated, non-outlier prices from a finished scrape."""
+        key = (platform, title_key(query))
+        if not key[1]:
+            return
+        cutoff = date.today() - timedelta(days=settings.TREND_RETENTION_DAYS)
+        with self.lock:
+            rollup = self.rollups.setdefault(key, {"day": {}, "week": {}})
+            seen = self.seen.setdefault(key, {})
+            for item in items:
+                price = item.get("price_value")
+                day = sold_day(item.get("sold_at"))
+                if price is None or day is None or day < cutoff or item.get("outlier"):
+                    continue
+                item_key = item.get("item_id") or item.get("item_url")
+                if item_key is not None:
+                    if item_key in seen:
+                        continue
+                    seen[item_key] = day
+                rollup["day"].setdefault(day, QuantileSketch()).add(price)
+                rollup["week"].setdefault(week_start(day), QuantileSketch()).add(price)
+            self._expire(rollup, seen, cutoff)
+
+    @staticmethod
+    def _expire(rollup, seen, cutoff):
+        for interval in TrendRollups.INTERVALS:
+            for period in [period for period in rollup[interval] if period < week_start(cutoff)]:
+                del rollup[interval][period]
+        for item_key in [item_key for item_key, day in seen.items() if day < cutoff]:
+            del seen[item_key]
+
+    def trend(self, query, platform="ebay", interval="day", days=365):
+        """Per-period count/median/p25/p75 for the last `days` days, oldest first."""
+        since = date.today() - timedelta(days=days)
+        with self.lock:
+            periods = self.rollups.get((platform, title_key(query)), {}).get(interval, {})
+            return [
+                {"period": period.isoformat(), **sketch.summary()}
+                for period, sketch in sorted(periods.items())
+                if period >= since
+            ]
+
+    def save(self, path):
+        with self.lock:
+            snapshot = [
+                {
+                    "platform": platform,
+                    "key": key,
+                    "rollups": {
+                        interval: {period.isoformat(): sketch.bins for period, sketch in periods.items()}
+                        for interval, periods in rollup.items()
+                    },
+                    "seen": {item_key: day.isoformat() for item_key, day in self.seen.get((platform, key), {}).items()},
+                }
+                for (platform, key), rollup in self.rollups.items()
+            ]
+        with open(path, "w") as file:
+            json.dump(snapshot, file)
+
+    def load(self, path):
+        try:
+            with open(path) as file:
+                snapshot = json.load(file)
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            console.error(f"❌ Could not read price trends {path}: {e}")
+            return
+        with self.lock:
+            for entry in snapshot:
+                key = (entry["platform"], entry["key"])
+                self.rollups[key] = {
+                    interval: {
+                        date.fromisoformat(period): QuantileSketch({int(index): n for index, n in bins.items()})
+                        for period, bins in periods.items()
+                    }
+                    for interval, periods in entry["rollups"].items()
+                }
+                self.seen[key] = {item_key: date.fromisoformat(day) for item_key, day in entry["seen"].items()}
+        console.info(f"✅ Loaded price trends for {len(snapshot)} queries from {path}")
+
+
+price_trends = TrendRollups()
@@ -0,0 +1,71 @@
+class SoldItem:
+    """
+    One scraped sold listing. Slotted to keep multi-page result sets small;
+    supports item["key"] / item.get("key") so the stats helpers treat it like
+    the dicts the scrapers used to build.
+    """
+
+    __slots__ = (
+        "title", "price", "price_value", "image_url", "item_url", "outlier",
+        "item_id", "sold_at", "condition",
+        "cluster_id", "cluster_size", "representative",
+    )
+
+    # Fields serialized when the caller does not pass ?fields=
+    DEFAULT_FIELDS = (
+        "title", "price", "price_value", "image_url", "item_url", "outlier", "item_id", "sold_at", "condition",
+    )
+    # Set by utils.clustering.cluster_items and serialized when clustering was requested
+    CLUSTER_FIELDS = ("cluster_id", "cluster_size", "representative")
+    # Derived fields that are only computed when explicitly requested
+    DERIVED_FIELDS = ("display_image",)
+
+    def __init__(self, title, price, price_value, image_url, item_url, outlier=None):
+        self.title = title
+        self.price = price
+        self.price_value = price_value
+        self.image_url = image_url
+        self.item_url = item_url
+        self.outlier = outlier
+        self.item_id = None
+        self.sold_at = None
+        self.condition = None
+        self.cluster_id = None
+        self.cluster_size = None
+        self.representative = None
+
+    @property
+    def display_image(self):
+        return f"![Image]({self.image_url})"
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self, fields=None):
+        return {field: getattr(self, field) for field in fields or self.DEFAULT_FIELDS}
+
+
+def parse_fields(fields, clustered=False):
+    """Turn a ?fields=a,b,c parameter into a tuple of known field names (None = defaults)."""
+    if not fields:
+        return SoldItem.DEFAULT_FIELDS + SoldItem.CLUSTER_FIELDS if clustered else None
+    known = SoldItem.DEFAULT_FIELDS + SoldItem.CLUSTER_FIELDS + SoldItem.DERIVED_FIELDS
+    selected = tuple(name for name in (part.strip() for part in fields.split(",")) if name in known)
+    return selected or None
+
+
+def project(items, fields=None, representatives_only=False):
+    """Serialize SoldItems to plain dicts holding only the requested fields."""
+    fields = fields or SoldItem.DEFAULT_FIELDS
+    if representatives_only:
+        items = [item for item in items if item.representative is not False]
+    return [item.to_dict(fields) for item in items]
@@ -0,0 +1,229 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from driver.driver_pool import DriverUnavailable
+from utils import settings, tracing
+from utils.admission import remaining_budget
+from utils.log_manager import console
+from utils.price_index import price_index
+from utils.price_trend import price_trends
+from utils.title_filter import filter_titles
+from utils.utils import cluster_and_detect_outliers, filter_price_range, paginate_adaptively
+
+UNSORTED = (None, "best_match")
+
+
+class PlatformParser:
+    """
+    One marketplace as the scrape engine sees it. Subclasses provide the
+    driver pool and page metrics, load a page on a leased driver, and name a
+    module-level `parse` function (html -> SoldItems) that can be pickled into
+    the parse process pool.
+    """
+
+    name = None  # Key for the price index and trends
+    label = None  # Display name for logs and errors
+    blocked_marker = None  # Text that marks a bot-check page instead of results
+    parse = None  # staticmethod wrapping a module-level parse function
+    driver_pool = None
+    metrics = None
+
+    def load(self, bot, url):
+        """Blocking driver calls for one page; runs on a worker thread. Returns the page HTML."""
+        bot.get(url)
+        return bot.page_html
+
+    def is_blocked(self, html_source):
+        return bool(self.blocked_marker) and self.blocked_marker in html_source
+
+    async def scrape_sold(self, query, page_url, max_pages, page_size=None, sort=None, narrowed=False,
+                          min_price=None, max_price=None, exclude_parts=True, cluster=False, cluster_stats=False,
+                          category=None, include_terms=(), exclude_terms=(), filter_report=None):
+        """
+        Page through `page_url(page)` results, then filter and flag outliers off the event loop.
+        `narrowed` marks site-side filters (condition, specifics, ...) that bias the comp sample.
+        """
+        results = await paginate_adaptively(
+            lambda page: engine.scrape_page(self, page_url(page), page),
+            max_pages=max_pages,
+            page_size=page_size,
+            # Sorted pages have monotone stats, so only an unsorted scrape can converge early
+            converge=sort in UNSORTED,
+        )
+        # Only plain searches give an unbiased comp sample for the price index and trends
+        record = not (narrowed or sort not in UNSORTED or min_price is not None or max_price is not None
+                      or not exclude_parts or include_terms or exclude_terms)
+        return await asyncio.to_thread(
+            self.finish_results, query, results, min_price, max_price, exclude_parts, cluster, cluster_stats,
+            category, include_terms, exclude_terms, filter_report, record,
+        )
+
+    def finish_results(self, query, results, min_price, max_price, exclude_parts, cluster, cluster_stats, category,
+                       include_terms, exclude_terms, filter_report, record):
+        # Site price filters are approximate (eBay may count shipping); enforce the bounds exactly
+        results = filter_price_range(results, min_price, max_price)
+        results = filter_titles(results, category, exclude_parts, include_terms, exclude_terms, filter_report)
+        results = cluster_and_detect_outliers(results, cluster, cluster_stats)
+        if record:
+            price_index.record(self.name, query, results)
+            price_trends.record(self.name, query, results)
+        return results
+
+    async def shutdown_all(self):
+        await asyncio.to_thread(self.driver_pool.shutdown)
+
+
+class ScrapeEngine:
+    """
+    Runs page fetches for every platform on the event loop. Drivers have no
+    async API, so each page load is one blocking call on a worker thread;
+    everything around it (waiting for a driver, backoff, captcha pauses) is
+    awaited, and parsing runs in a small process pool.
+    """
+
+    def __init__(self, processes):
+        self.processes = processes
+        self.parse_pool = None
+        self.pool_lock = threading.Lock()
+        self.semaphores = weakref.WeakKeyDictionary()  # event loop -> {platform label: Semaphore}
+
+    def start(self):
+        """Create the parse pool and start its workers; called from the app's startup hook."""
+        with self.pool_lock:
+            if self.parse_pool is not None or self.processes <= 0:
+                return
+            # Never fork the app itself: its background threads may hold locks (logging) the child would inherit
+            # held. Workers come from a forkserver that has only the parser modules loaded, or are spawned.
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            context = multiprocessing.get_context(start_method)
+            if start_method == "forkserver":
+                context.set_forkserver_preload(list(settings.SCRAPER_PARSE_MODULES))
+            parse_pool = ProcessPoolExecutor(self.processes, mp_context=context)
+            # A builtin, so the warm-up doesn't import this module (and the driver pools) into the worker
+            parse_pool.submit(os.getpid).result()
+            self.parse_pool = parse_pool
+        console.info(f"✅ Scrape parse pool started with {self.processes} {start_method} processes.")
+
+    def restart(self, broken):
+        """Replace a pool whose worker died (once, however many parses saw it break)."""
+        with self.pool_lock:
+            if self.parse_pool is not broken:
+                return
+            self.parse_pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    def shutdown(self):
+        with self.pool_lock:
+            parse_pool, self.parse_pool = self.parse_pool, None
+        if parse_pool is not None:
+            parse_pool.shutdown(wait=False, cancel_futures=True)
+
+    def semaphore(self, platform):
+        # One slot per driver, so pages queue on the event loop rather than in blocked threads
+        semaphores = self.semaphores.setdefault(asyncio.get_running_loop(), {})
+        if platform.label not in semaphores:
+            semaphores[platform.label] = asyncio.Semaphore(max(1, platform.driver_pool.size))
+        return semaphores[platform.label]
+
+    async def parse(self, platform, html_source):
+        parse_pool = self.parse_pool
+        if parse_pool is not None:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(parse_pool, platform.parse, html_source)
+            except BrokenProcessPool:
+                console.error("❌ Scrape parse worker died; restarting the parse pool.")
+                await asyncio.to_thread(self.restart, parse_pool)
+        return await asyncio.to_thread(platform.parse, html_source)
+
+    @staticmethod
+    def _unavailable(platform, page):
+        console.error(f"No available drivers in pool for {platform.label}.")
+        if page == 1:
+            raise DriverUnavailable(f"No {platform.label} driver free within the request deadline")
+        return None
+
+    @staticmethod
+    def _release(platform, semaphore, pending, bot):
+        """Return the driver (leased by `pending` if the caller never saw it) and its slot."""
+        if bot is None and pending is not None and not pending.cancelled() and pending.exception() is None:
+            bot = pending.result()
+        if bot is not None:
+            platform.driver_pool.put(bot)
+        semaphore.release()
+
+    async def fetch(self, platform, url, page):
+        """Load one page on a leased driver with async backoff; None if every attempt failed."""
+        semaphore = self.semaphore(platform)
+        try:
+            with tracing.span("driver_wait"):
+                await asyncio.wait_for(semaphore.acquire(), timeout=remaining_budget(10))
+        except asyncio.TimeoutError:
+            return self._unavailable(platform, page)
+
+        # Driver calls run shielded on worker threads; `pending` is the latest one, so a
+        # cancelled fetch can hand the driver back only once that thread is done with it
+        pending = bot = None
+        try:
+            pending = asyncio.ensure_future(
+                asyncio.to_thread(platform.driver_pool.get, timeout=remaining_budget(10))
+            )
+            try:
+                with tracing.span("driver_lease"):
+                    bot = await asyncio.shield(pending)
+            except queue.Empty:
+                return self._unavailable(platform, page)
+
+            for attempt in range(settings.SCRAPER_PAGE_ATTEMPTS):
+                try:
+                    start = time.perf_counter()
+                    with tracing.span("page_load", page=page, attempt=attempt + 1):
+                        pending = asyncio.ensure_future(asyncio.to_thread(platform.load, bot, url))
+                        html_source = await asyncio.shield(pending)
+                    platform.metrics.fetch.observe(time.perf_counter() - start)
+                    platform.metrics.pages.inc()
+                    return html_source
+                except Exception as e:
+                    console.error(f"Error fetching page {page} (Attempt {attempt + 1}): {e}")
+                    await asyncio.sleep(2 ** attempt)
+            console.error(f"❌ Failed to fetch page {page} after multiple attempts.")
+            return None
+        finally:
+            if pending is not None and not pending.done():
+                pending.add_done_callback(lambda future: self._release(platform, semaphore, future, bot))
+            else:
+                self._release(platform, semaphore, pending, bot)
+
+    async def scrape_page(self, platform, url, page=1):
+        """Fetch and parse one results page, pausing and retrying on a captcha."""
+        with tracing.span("scrape_page", page=page):
+            for _ in range(settings.SCRAPER_CAPTCHA_RETRIES + 1):
+                html_source = await self.fetch(platform, url, page)
+                if html_source is None:
+                    return []
+                if not platform.is_blocked(html_source):
+                    break
+                platform.metrics.captchas.inc()
+                console.warning("🚨 CAPTCHA detected! Retrying after 10 seconds...")
+                with tracing.span("captcha_sleep"):
+                    await asyncio.sleep(10)
+            else:
+                console.error(f"❌ Still blocked on page {page}; giving up.")
+                return []
+
+            parse_start = time.perf_counter()
+            with tracing.span("parse"):
+                local_results = await self.parse(platform, html_source)
+            platform.metrics.parse.observe(time.perf_counter() - parse_start)
+            platform.metrics.items.observe(len(local_results))
+            return local_results
+
+
+engine = ScrapeEngine(settings.SCRAPER_PARSE_PROCESSES)
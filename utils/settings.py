@@ -1,13 +1,162 @@
 # Configuration settings
+import os
 
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 DEFAULT_HEADERS = {"User-Agent": USER_AGENT}
 
-# Number of pages to scrape on eBay (can be adjusted)
-SCRAPER_NUM_PAGES = 1
+# Upper bound on pages fetched per query; paging usually stops well before this
+SCRAPER_NUM_PAGES = 5
+# Hard cap on a caller's Mercari num_pages (Mercari has no page-size parameter, so callers page deeper)
+MERCARI_MAX_PAGES = int(os.getenv("MERCARI_MAX_PAGES", 20))
+# Largest page size eBay accepts for the _ipg parameter
+EBAY_ITEMS_PER_PAGE = 240
+# Stop paging once the running median and IQR move less than this fraction of the median
+SCRAPER_CONVERGENCE_TOLERANCE = 0.02
+# Pages fetched in parallel after page 1 (each wave is checked before the next)
+SCRAPER_PAGE_CONCURRENCY = 1
+# Load attempts per page (with 1s, 2s, ... backoff) and pauses allowed for captcha pages
+SCRAPER_PAGE_ATTEMPTS = 3
+SCRAPER_CAPTCHA_RETRIES = 3
+# Worker processes that parse scraped pages (0 = parse on threads)
+SCRAPER_PARSE_PROCESSES = int(os.getenv("SCRAPER_PARSE_PROCESSES", 2))
+# Imported once in the forkserver so parse workers start with the (driver-free) parser modules loaded
+SCRAPER_PARSE_MODULES = ("platforms.ebay.automation.ebay_parser", "platforms.mercari.automation.mercari_parser")
 # Number of Botasaurus drivers to spawn at startup
-SCRAPER_NUM_DRIVERS = 1
+SCRAPER_NUM_DRIVERS = int(os.getenv("SCRAPER_NUM_DRIVERS", 1))
+# "botasaurus" for real browsers, "fake" to replay HTML fixtures (benchmarks, load replays)
+DRIVER_BACKEND = os.getenv("DRIVER_BACKEND", "botasaurus")
+# Recorded result pages served by the fake driver, and its simulated page load time
+FAKE_DRIVER_FIXTURES = os.getenv(
+    "FAKE_DRIVER_FIXTURES",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures"),
+)
+FAKE_DRIVER_LATENCY = float(os.getenv("FAKE_DRIVER_LATENCY", 0))
+# New browsers start from a copy of a warmed per-platform profile (set to 0 to use empty profiles)
+BROWSER_PROFILES_ENABLED = os.getenv("BROWSER_PROFILES_ENABLED", "1") == "1"
+# Where warm profile snapshots and per-driver clones are kept
+BROWSER_PROFILE_DIR = os.getenv("BROWSER_PROFILE_DIR", os.path.join("profiles", "warm"))
+# Rebuild a platform's snapshot once it is older than this many seconds
+BROWSER_PROFILE_REFRESH_SECONDS = int(os.getenv("BROWSER_PROFILE_REFRESH_SECONDS", 6 * 3600))
+# Pages visited to warm each platform's profile (consent, region redirect, static asset cache)
+BROWSER_PROFILE_WARMUP_URLS = {
+    "ebay": [
+        "https://www.ebay.com/",
+        "https://www.ebay.com/sch/i.html?_nkw=iphone&LH_Sold=1&LH_Complete=1",
+    ],
+    "mercari": [
+        "https://www.mercari.com/",
+        "https://www.mercari.com/search/?keyword=iphone&status=sold_out",
+    ],
+    "stealth": ["https://www.ebay.com/"],
+}
 # Outlier detection multiplier for the IQR method (default 1.5)
 OUTLIER_IQR_MULTIPLIER = 1.5
+# Near-duplicate title clustering: MinHash permutations, LSH bands and the Jaccard
+# similarity two titles need to share a cluster
+CLUSTER_NUM_PERM = 48
+CLUSTER_BANDS = 12
+CLUSTER_SIMILARITY = 0.7
+# Title keywords that mark a listing as not comparable (applied when exclude_parts=True).
+# "default" always applies; other keys are selected with the `category` parameter.
+TITLE_EXCLUDE_TERMS = {
+    "default": [
+        "for parts", "parts only", "for parts or repair", "not working", "non working", "doesn't work",
+        "does not work", "broken", "box only", "empty box", "no console", "case only", "as is",
+        "damaged", "faulty", "replica", "lot of", "bundle lot",
+    ],
+    "phones": [
+        "broken screen", "cracked screen", "cracked", "icloud locked", "activation locked", "bad esn",
+        "blacklisted", "blocked imei", "fmi on", "no power", "won't turn on", "screen only",
+        "housing only", "back glass", "motherboard", "logic board",
+    ],
+    "consoles": [
+        "controller only", "console only", "disc drive", "no power", "red ring", "hdmi port",
+    ],
+    "computers": [
+        "no ssd", "no hard drive", "no ram", "bios locked", "motherboard", "logic board", "no charger",
+    ],
+}
+# Title keywords a listing must contain (at least one) when the category is selected
+TITLE_INCLUDE_TERMS = {}
+# Stealth posting workers (each holds one stealth driver while the queue is busy)
+STEALTH_POST_WORKERS = int(os.getenv("STEALTH_POST_WORKERS", SCRAPER_NUM_DRIVERS))
+# A worker hands its driver back after the queue has been empty this long
+STEALTH_SESSION_IDLE_SECONDS = 30
+# How long a worker waits to lease a stealth driver before failing the listing
+STEALTH_DRIVER_WAIT_SECONDS = 60
+# How long /sell-item-stealth waits for its queued listing to be posted
+STEALTH_POST_TIMEOUT_SECONDS = 300
+# Finished batch jobs are kept for status polling for this long
+STEALTH_JOB_TTL_SECONDS = 3600
+# Most recent non-outlier comps kept per product key in the price-suggestion index
+PRICE_INDEX_MAX_SAMPLES = 500
+# Most word subsets of a listing title tried when it has no exact key (bounds lookups for long titles)
+PRICE_INDEX_MAX_SUBSET_LOOKUPS = 2000
+# Persist the price-suggestion index here across restarts (disabled when unset)
+PRICE_INDEX_PATH = os.getenv("PRICE_INDEX_PATH")
+# Price trend rollups: days of history kept, quantile sketch relative accuracy, and
+# where to persist them across restarts (disabled when unset)
+TREND_RETENTION_DAYS = 400
+TREND_SKETCH_ACCURACY = 0.01
+TREND_PATH = os.getenv("TREND_PATH")
+# /img/ thumbnail proxy: disk cache location and size bound, thumbnail widths, source
+# hosts it may fetch from (comma-separated env override), fetch limits and JPEG quality
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join("cache", "images"))
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+IMAGE_THUMBNAIL_SIZES = (96, 225, 500)
+IMAGE_ALLOWED_HOSTS = tuple(
+    host.strip()
+    for host in os.getenv("IMAGE_ALLOWED_HOSTS", "i.ebayimg.com,u-mercari-images.mercdn.net,static.mercdn.net").split(",")
+    if host.strip()
+)
+IMAGE_FETCH_TIMEOUT = 10
+IMAGE_MAX_SOURCE_BYTES = 10 * 1024 * 1024
+IMAGE_JPEG_QUALITY = 80
+# Local SQLite mirror of eBay inventory items and offers backing /listings, /drafts and
+# /listing/{id}: database file, page size and parallel page fetches per sync, and how
+# old the mirror may get before a background refresh
+LISTING_MIRROR_PATH = os.getenv("LISTING_MIRROR_PATH", "listing_mirror.db")
+LISTING_MIRROR_PAGE_SIZE = 200
+LISTING_MIRROR_CONCURRENCY = 8
+LISTING_MIRROR_REFRESH_SECONDS = int(os.getenv("LISTING_MIRROR_REFRESH_SECONDS", 300))
+# Background refreshes only fetch offers for new or changed items; every SKU's offers are
+# re-pulled at most this often (and on POST /listings/sync)
+LISTING_MIRROR_FULL_SYNC_SECONDS = int(os.getenv("LISTING_MIRROR_FULL_SYNC_SECONDS", 6 * 3600))
+# Admission control: per route class, requests running at once, requests allowed to queue
+# behind them, and the deadline (seconds) for queueing plus driver acquisition. "stale"
+# classes answer from the last good response instead of 429/503 when overloaded.
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1") == "1"
+ADMISSION_LIMITS = {
+    "ebay_scrape": {"concurrency": SCRAPER_NUM_DRIVERS, "queue_size": 2 * SCRAPER_NUM_DRIVERS, "timeout": 30, "stale": True},
+    "mercari_scrape": {"concurrency": SCRAPER_NUM_DRIVERS, "queue_size": 2 * SCRAPER_NUM_DRIVERS, "timeout": 30, "stale": True},
+    "ebay_api": {"concurrency": 16, "queue_size": 64, "timeout": 15},
+}
+# Path -> route class; keys ending in "/" match by prefix
+ADMISSION_ROUTES = {
+    "/sold-items": "ebay_scrape",
+    "/mercari-sold-items": "mercari_scrape",
+    "/sell-item": "ebay_api",
+    "/listings": "ebay_api",
+    "/drafts": "ebay_api",
+    "/listing/": "ebay_api",
+    "/modify-listing/": "ebay_api",
+}
+# Retry-After sent when a scrape could not lease a driver in time
+DRIVER_RETRY_AFTER_SECONDS = 5
+# Responses kept for stale serving, and how old one may be
+ADMISSION_STALE_ENTRIES = 256
+ADMISSION_STALE_MAX_AGE = 24 * 3600
 # eBay maketplace ID
-EBAY_MARKETPLACE_ID = "EBAY_US"
\ No newline at end of file
+EBAY_MARKETPLACE_ID = "EBAY_US"
+# Base URL for eBay REST APIs (point at benchmarks/mock_ebay_api.py for offline runs)
+EBAY_API_BASE = os.getenv("EBAY_API_BASE", "https://api.ebay.com")
+# Append finished request traces as JSON lines to this file (disabled when unset)
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")
+# Base URL of an OTLP/HTTP collector to receive traces (disabled when unset)
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT")
+# Number of slowest request traces kept in memory for /debug/slow-requests
+TRACE_SLOWEST_KEEP = 50
+# Record incoming requests as JSON lines for benchmarks/replay.py (disabled when unset)
+TRAFFIC_CAPTURE_PATH = os.getenv("TRAFFIC_CAPTURE_PATH")
+# Request bodies longer than this many bytes are truncated in the capture log
+TRAFFIC_CAPTURE_MAX_BODY = 65536
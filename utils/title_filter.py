@@ -0,0 +1,90 @@
+import re
+from functools import lru_cache
+
+from utils import metrics, settings, tracing
+
+
+def _normalize(term):
+    return " ".join(term.lower().split())
+
+
+def _compile(terms):
+    """One case-insensitive alternation for all terms; longest first so "broken screen" beats "broken"."""
+    terms = sorted({_normalize(term) for term in terms if term.strip()}, key=len, reverse=True)
+    if not terms:
+        return None
+    alternation = "|".join(r"\s+".join(map(re.escape, term.split())) for term in terms)
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", re.IGNORECASE)
+
+
+class TitleFilter:
+    """Compiled exclusion/inclusion matcher; each title is scanned once per list."""
+
+    def __init__(self, exclude_terms, include_terms, custom_terms=()):
+        self.exclude = _compile(exclude_terms)
+        self.include = _compile(include_terms)
+        # Caller-supplied terms share one metric label to keep label cardinality bounded
+        self.custom_terms = {_normalize(term) for term in custom_terms}
+
+    def apply(self, items):
+        """Return (kept_items, report) where report counts removals per matched term."""
+        kept = []
+        matches = {}
+        not_included = 0
+        exclude, include = self.exclude, self.include
+        for item in items:
+            title = item.get("title") or ""
+            if exclude is not None:
+                found = exclude.search(title)
+                if found:
+                    term = _normalize(found.group(0))
+                    matches[term] = matches.get(term, 0) + 1
+                    continue
+            if include is not None and not include.search(title):
+                not_included += 1
+                continue
+            kept.append(item)
+
+        for term, count in matches.items():
+            metrics.TITLE_FILTER_MATCHES.labels("custom" if term in self.custom_terms else term).inc(count)
+        if not_included:
+            metrics.TITLE_FILTER_MATCHES.labels("(no include match)").inc(not_included)
+        report = {
+            "scanned": len(items),
+            "excluded": sum(matches.values()),
+            "not_included": not_included,
+            "matches": matches,
+        }
+        return kept, report
+
+
+@lru_cache(maxsize=128)
+def get_title_filter(category=None, exclude_parts=True, extra_exclude=(), extra_include=()):
+    """Build (once) the filter for a category plus any caller-supplied terms."""
+    exclude_terms = list(extra_exclude)
+    if exclude_parts:
+        exclude_terms += settings.TITLE_EXCLUDE_TERMS.get("default", [])
+        exclude_terms += settings.TITLE_EXCLUDE_TERMS.get(category, []) if category else []
+    include_terms = list(extra_include)
+    include_terms += settings.TITLE_INCLUDE_TERMS.get(category, []) if category else []
+    return TitleFilter(tuple(exclude_terms), tuple(include_terms), extra_exclude)
+
+
+def split_terms(terms):
+    """Parse a comma-separated query parameter into a hashable tuple of terms."""
+    return tuple(term.strip() for term in (terms or "").split(",") if term.strip())
+
+
+@tracing.traced("title_filter")
+def filter_titles(items, category=None, exclude_parts=True, include_terms=(), exclude_terms=(), report=None):
+    """
+    Drop listings whose titles hit an exclusion term (or miss every inclusion term).
+    Match counts are added to `report` when a dict is passed.
+    """
+    title_filter = get_title_filter(category, exclude_parts, tuple(exclude_terms), tuple(include_terms))
+    if title_filter.exclude is None and title_filter.include is None:
+        return items
+    kept, filter_report = title_filter.apply(items)
+    if report is not None:
+        report.update(filter_report)
+    return kept
@@ -0,0 +1,227 @@
+import contextvars
+import functools
+import heapq
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from utils import settings
+from utils.log_manager import console
+
+_current_span = contextvars.ContextVar("price_it_current_span", default=None)
+_sequence = itertools.count()
+
+
+class Span:
+    __slots__ = ("span_id", "name", "trace", "parent", "start", "end", "attributes", "children")
+
+    def __init__(self, name, trace, parent=None, attributes=None):
+        self.span_id = os.urandom(8).hex()
+        self.name = name
+        self.trace = trace
+        self.parent = parent
+        self.start = time.perf_counter()
+        self.end = None
+        self.attributes = attributes or {}
+        self.children = []
+
+    @property
+    def duration_ms(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "offset_ms": round((self.start - self.trace.root.start) * 1000, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class Trace:
+    """One request's span tree; spans may be added from worker threads."""
+
+    def __init__(self, name, attributes=None):
+        self.trace_id = os.urandom(16).hex()
+        self.lock = threading.Lock()
+        self.wall_start = time.time()
+        self.root = Span(name, self, attributes=attributes)
+
+    def spans(self):
+        stack = [self.root]
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(current.children)
+
+    def to_dict(self):
+        return {"trace_id": self.trace_id, "start": self.wall_start, **self.root.to_dict()}
+
+
+@contextmanager
+def span(name, **attributes):
+    """Time a block as a child of the current span; a no-op outside a trace."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, parent.trace, parent, attributes)
+    with parent.trace.lock:
+        parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    finally:
+        child.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def traced(name):
+    """Decorator form of span()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_trace(name, **attributes):
+    trace = Trace(name, attributes)
+    return trace, _current_span.set(trace.root)
+
+
+def finish_trace(trace, token):
+    if trace.root.end is None:
+        trace.root.end = time.perf_counter()
+    _current_span.reset(token)
+    _slowest.add(trace)
+    if settings.TRACE_EXPORT_PATH or settings.TRACE_OTLP_ENDPOINT:
+        _exporter.submit(trace)
+
+
+def in_current_context(func):
+    """Wrap a thread target so its spans attach to the caller's trace."""
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+def server_timing(trace):
+    """Build a Server-Timing header value, summing spans that share a name."""
+    totals = {}
+    counts = {}
+    with trace.lock:
+        spans = [s for s in trace.spans() if s is not trace.root]
+    for s in spans:
+        totals[s.name] = totals.get(s.name, 0.0) + s.duration_ms
+        counts[s.name] = counts.get(s.name, 0) + 1
+    entries = [f"total;dur={trace.root.duration_ms:.1f}"]
+    for name, total in totals.items():
+        entry = f"{name};dur={total:.1f}"
+        if counts[name] > 1:
+            entry += f';desc="x{counts[name]}"'
+        entries.append(entry)
+    return ", ".join(entries)
+
+
+class SlowestTraces:
+    """Keeps the N slowest finished traces in a min-heap."""
+
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.heap = []
+
+    def add(self, trace):
+        entry = (trace.root.duration_ms, next(_sequence), trace)
+        with self.lock:
+            if len(self.heap) < self.size:
+                heapq.heappush(self.heap, entry)
+            elif entry[0] > self.heap[0][0]:
+                heapq.heapreplace(self.heap, entry)
+
+    def snapshot(self):
+        with self.lock:
+            entries = sorted(self.heap, key=lambda e: e[0], reverse=True)
+        return [trace.to_dict() for _, _, trace in entries]
+
+
+class TraceExporter:
+    """Writes finished traces to a JSONL file and/or an OTLP/HTTP JSON collector off the request path."""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=1000)
+        self.thread = None
+
+    def submit(self, trace):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        try:
+            self.queue.put_nowait(trace)
+        except queue.Full:
+            console.warning("Trace export queue full, dropping trace.")
+
+    def _run(self):
+        while True:
+            trace = self.queue.get()
+            try:
+                if settings.TRACE_EXPORT_PATH:
+                    with open(settings.TRACE_EXPORT_PATH, "a") as file:
+                        file.write(json.dumps(trace.to_dict()) + "\n")
+                if settings.TRACE_OTLP_ENDPOINT:
+                    requests.post(
+                        f"{settings.TRACE_OTLP_ENDPOINT.rstrip('/')}/v1/traces",
+                        json=to_otlp(trace),
+                        timeout=5,
+                    )
+            except Exception as e:
+                console.error(f"Trace export failed: {e}")
+
+
+def to_otlp(trace):
+    """Convert a trace to the OTLP/HTTP JSON format."""
+    def nanos(offset):
+        return str(int((trace.wall_start + offset - trace.root.start) * 1e9))
+
+    with trace.lock:
+        spans = list(trace.spans())
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "price-it"}}]},
+            "scopeSpans": [{
+                "scope": {"name": "price-it"},
+                "spans": [
+                    {
+                        "traceId": trace.trace_id,
+                        "spanId": s.span_id,
+                        "parentSpanId": s.parent.span_id if s.parent else "",
+                        "name": s.name,
+                        "kind": 1,
+                        "startTimeUnixNano": nanos(s.start),
+                        "endTimeUnixNano": nanos(s.end if s.end is not None else s.start),
+                        "attributes": [
+                            {"key": key, "value": {"stringValue": str(value)}}
+                            for key, value in s.attributes.items()
+                        ],
+                    }
+                    for s in spans
+                ],
+            }],
+        }]
+    }
+
+
+_slowest = SlowestTraces(settings.TRACE_SLOWEST_KEEP)
+_exporter = TraceExporter()
+
+
+def slowest_traces():
+    return _slowest.snapshot()
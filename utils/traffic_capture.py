@@ -0,0 +1,85 @@
+import json
+import queue
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode
+
+from utils import settings
+from utils.log_manager import console
+
+# Routes that describe the service itself rather than client traffic
+SKIPPED_PREFIXES = ("/metrics", "/debug", "/docs", "/openapi.json")
+# eBay's OAuth callbacks carry the authorization code and state in the query string
+SKIPPED_PATHS = ("/", "/auth/accepted")
+# Query parameters that are never written to the log, whatever the route
+REDACTED_PARAMS = {"code", "state"}
+
+
+class TrafficRecorder:
+    """
+    Appends one compact JSON line per request to TRAFFIC_CAPTURE_PATH:
+    t=start time, m=method, r=route template, p=path, q=query string,
+    b=body (text, truncated), s=status, d=duration in ms.
+    Writes happen on a background thread so recording never blocks a request.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.queue = queue.Queue(maxsize=10000)
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def record(self, entry):
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            console.warning("Traffic capture queue full, dropping request record.")
+
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as file:
+            while True:
+                entry = self.queue.get()
+                file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+                if self.queue.empty():
+                    file.flush()
+
+
+def redact_query(query):
+    """Replace the values of REDACTED_PARAMS in a raw query string."""
+    if not query or not any(name in query for name in REDACTED_PARAMS):
+        return query
+    pairs = parse_qsl(query, keep_blank_values=True)
+    return urlencode([(name, "REDACTED" if name in REDACTED_PARAMS else value) for name, value in pairs])
+
+
+async def capture_traffic(request, call_next, recorder):
+    """Middleware body: record the request, then pass it through untouched."""
+    path = request.url.path
+    if path in SKIPPED_PATHS or path.startswith(SKIPPED_PREFIXES):
+        return await call_next(request)
+
+    body = None
+    if request.method in ("POST", "PUT", "PATCH"):
+        raw = await request.body()
+        body = raw[: settings.TRAFFIC_CAPTURE_MAX_BODY].decode("utf-8", errors="replace")
+
+    wall_start = time.time()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        entry = {
+            "t": round(wall_start, 3),
+            "m": request.method,
+            "r": getattr(route, "path", None),
+            "p": request.url.path,
+            "q": redact_query(request.url.query),
+            "s": status,
+            "d": round((time.perf_counter() - start) * 1000, 1),
+        }
+        if body:
+            entry["b"] = body
+        recorder.record(entry)
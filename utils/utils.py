@@ -1,17 +1,24 @@
+import asyncio
 import statistics
 
+from utils import settings, tracing
+from utils.clustering import cluster_items, cluster_median_prices
 
-def detect_price_outliers(items):
+
+@tracing.traced("outliers")
+def detect_price_outliers(items, reference_prices=None):
     """
     Enhanced outlier detection using:
     - Interquartile Range (IQR) method with dynamic multiplier
     - Modified Z-Score method for robustness
     - Dynamic fallback based on mean deviation for small datasets
+    Thresholds are fitted to `reference_prices` when given (e.g. one median per
+    near-duplicate cluster) and to the items' own prices otherwise.
     """
 
     # Extract valid prices
-    prices = []
-    for item in items:
+    prices = list(reference_prices) if reference_prices is not None else []
+    for item in items if reference_prices is None else ():
         try:
             if item.get("price_value") is not None:
                 prices.append(item["price_value"])
@@ -84,3 +91,94 @@ def detect_price_outliers(items):
             item["outlier"] = None
 
     return items
+
+
+
+def cluster_and_detect_outliers(items, cluster=False, cluster_stats=False):
+    """
+    Optionally group near-duplicate listings, then flag outliers. With
+    `cluster_stats` the thresholds come from one median per cluster, so thirty
+    relists of the same phone count once.
+    """
+    if not (cluster or cluster_stats):
+        return detect_price_outliers(items)
+    clusters = cluster_items(items)
+    reference = cluster_median_prices(clusters) if cluster_stats else None
+    return detect_price_outliers(items, reference)
+
+def filter_price_range(items, min_price=None, max_price=None):
+    """Exact price bounds, applied after the site's own (approximate) price filter."""
+    if min_price is None and max_price is None:
+        return items
+    return [
+        item for item in items
+        if item.get("price_value") is not None
+        and (min_price is None or item["price_value"] >= min_price)
+        and (max_price is None or item["price_value"] <= max_price)
+    ]
+
+
+def price_summary(items):
+    """Return the (median, IQR) of the items' prices, or None when too few are priced."""
+    prices = sorted(
+        item["price_value"] for item in items if item.get("price_value") is not None
+    )
+    n = len(prices)
+    if n < 2:
+        return None
+    mid = n // 2
+    median_price = statistics.median(prices)
+    q1 = statistics.median(prices[:mid])
+    q3 = statistics.median(prices[mid + (n % 2):])
+    return median_price, q3 - q1
+
+
+def stats_converged(previous, current, tolerance):
+    """Check whether median and IQR moved less than `tolerance` of the median."""
+    if previous is None or current is None:
+        return False
+    scale = abs(current[0]) or 1
+    return (
+        abs(current[0] - previous[0]) / scale <= tolerance
+        and abs(current[1] - previous[1]) / scale <= tolerance
+    )
+
+
+async def paginate_adaptively(fetch_page, max_pages, page_size=None, tolerance=None, concurrency=None, converge=True):
+    """
+    Fetch result pages until more pages stop adding information:
+    - Page 1 is always fetched alone, so single-page queries waste nothing
+    - A page shorter than `page_size` (or than page 1) means there are no more results
+    - Paging stops once the running median/IQR has converged within `tolerance`
+      (unless `converge` is False, e.g. for price-sorted pages)
+    Later pages are fetched in waves of `concurrency` concurrent coroutines.
+    """
+    tolerance = settings.SCRAPER_CONVERGENCE_TOLERANCE if tolerance is None else tolerance
+    concurrency = max(1, concurrency or settings.SCRAPER_PAGE_CONCURRENCY)
+
+    results = list(await fetch_page(1) or [])
+    page_size = page_size or len(results)
+    if not results or len(results) < page_size:
+        return results
+
+    previous = price_summary(results)
+    page = 2
+    while page <= max_pages:
+        wave = list(range(page, min(page + concurrency, max_pages + 1)))
+        pages = await asyncio.gather(*(fetch_page(page_number) for page_number in wave))
+
+        short_page = False
+        for items in pages:
+            items = items or []
+            results.extend(items)
+            short_page = short_page or len(items) < page_size
+        if short_page:
+            break
+
+        current = price_summary(results)
+        if converge and stats_converged(previous, current, tolerance):
+            break
+        previous = current
+        page += len(wave)
+
+    return results